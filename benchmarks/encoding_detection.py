@@ -0,0 +1,66 @@
+""" Micro-benchmark comparing the layered encoding detector with the legacy chardet-only detector """
+import os
+import sys
+import tempfile
+import timeit
+from chardet import UniversalDetector
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import scratchpad
+
+
+""" Detector used by FileHandler before the layered detector was introduced """
+def legacy_detect(file_path):
+    detector = UniversalDetector()
+    with open(file_path, 'rb') as file:
+        while chunk := file.read(1024):
+            detector.feed(chunk)
+            if detector.done:
+                break
+        detector.close()
+    return detector.result['encoding'] or 'utf-8'
+
+
+def layered_detect(file_path):
+    with open(file_path, 'rb') as file:
+        return scratchpad.sniff_encoding(file.read(scratchpad.ENCODING_SAMPLE_SIZE))
+
+
+def build_corpora(directory, size):
+    line = "The quick brown fox jumps over the lazy dog 0123456789\n"
+    accented = "Příliš žluťoučký kůň úpěl ďábelské ódy — naïve café\n"
+    latin = "Élève, garçon, déjà vu, señor, Müller, smørrebrød\n"
+    corpora = {
+        'ascii': (line * (size // len(line) + 1)).encode('ascii'),
+        'utf-8': ((line + accented) * (size // len(line + accented) + 1)).encode('utf-8'),
+        'utf-16': ((line + accented) * (size // (2 * len(line + accented)) + 1)).encode('utf-16'),
+        'latin-1': ((line + latin) * (size // len(line + latin) + 1)).encode('latin-1'),
+    }
+    paths = {}
+    for name, data in corpora.items():
+        path = os.path.join(directory, f"{name}.txt")
+        with open(path, 'wb') as file:
+            file.write(data[:size])
+        paths[name] = path
+    return paths
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 4 * 1024 * 1024
+    repeat = 5
+    with tempfile.TemporaryDirectory() as directory:
+        cache = scratchpad.EncodingCache(os.path.join(directory, 'encodings.json'))
+        print(f"{'corpus':<10}{'legacy':>24}{'layered':>24}{'cached':>12}")
+        for name, path in build_corpora(directory, size).items():
+            results = []
+            for detect in (legacy_detect, layered_detect):
+                seconds = min(timeit.repeat(lambda: detect(path), number=1, repeat=repeat))
+                results.append(f"{detect(path)} {seconds * 1000:.2f} ms")
+            file_stat = os.stat(path)
+            cache.put(path, file_stat, layered_detect(path))
+            seconds = min(timeit.repeat(lambda: cache.get(path, os.stat(path)), number=1, repeat=repeat))
+            print(f"{name:<10}{results[0]:>24}{results[1]:>24}{seconds * 1000:>9.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
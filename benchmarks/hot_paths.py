@@ -0,0 +1,290 @@
+""" Headless benchmark suite for the editor's hot paths
+
+Run with QT_QPA_PLATFORM=offscreen (set automatically when unset), for example:
+
+    python benchmarks/hot_paths.py --sizes 1K,1M,64M --output run.json
+    python benchmarks/hot_paths.py --compare baseline.json run.json
+"""
+import os
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import threading
+import functools
+import http.server
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QTimer, QEventLoop, QSettings, QT_VERSION_STR, PYQT_VERSION_STR
+import scratchpad
+
+
+CASES = ['load', 'set_plain_text', 'update_status_bar', 'find_next', 'replace_all', 'save', 'web_import']
+STALL_THRESHOLD = 0.05
+WORDS = ['alpha', 'bravo', 'charlie', 'delta', 'echo', 'foxtrot', 'golf', 'hotel', 'india',
+         'juliett', 'kilo', 'lima', 'mike', 'november', 'oscar', 'papa', 'quebec', 'romeo',
+         'sierra', 'tango', 'uniform', 'victor', 'whiskey', 'x-ray', 'yankee', 'zulu',
+         'café', 'naïve', 'über', 'façade']
+
+
+def parse_size(text):
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    text = text.strip().upper()
+    if text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+""" Utility function to write a deterministic corpus of the given size, encoding and line length """
+def build_corpus(directory, size, encoding, line_length):
+    path = os.path.join(directory, f"corpus-{size}-{encoding}-{line_length}.txt")
+    if os.path.exists(path):
+        return path
+    generator = random.Random(size ^ line_length)
+    lines = []
+    for number in range(2048):
+        words = [] if number % 16 else ['needle']
+        while sum(len(word) + 1 for word in words) < line_length:
+            words.append(generator.choice(WORDS))
+        lines.append(' '.join(words)[:line_length])
+    block = ('\n'.join(lines) + '\n').encode(encoding)
+    if block.startswith((b'\xff\xfe', b'\xfe\xff')):
+        block = block[2:]
+        prefix = '\ufeff'.encode(encoding)[:2]
+    else:
+        prefix = b''
+    with open(path, 'wb') as file:
+        file.write(prefix)
+        written = len(prefix)
+        while written < size:
+            piece = block[:size - written]
+            file.write(piece)
+            written += len(piece)
+    return path
+
+
+""" Utility function to reset and read the peak resident set size of this process """
+def reset_peak_rss():
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+    except OSError:
+        pass
+
+
+def peak_rss():
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+""" Runs one operation inside the Qt event loop while a heartbeat timer records UI-thread stalls """
+def measure(operation, done=lambda: True, timeout=3600):
+    stalls = []
+    last = [time.perf_counter()]
+
+    def heartbeat():
+        now = time.perf_counter()
+        if now - last[0] > STALL_THRESHOLD:
+            stalls.append(now - last[0])
+        last[0] = now
+
+    loop = QEventLoop()
+    heartbeat_timer = QTimer()
+    heartbeat_timer.setInterval(10)
+    heartbeat_timer.timeout.connect(heartbeat)
+    poll_timer = QTimer()
+    poll_timer.setInterval(5)
+    started = [0.0]
+    finished = [None]
+
+    def start():
+        last[0] = started[0] = time.perf_counter()
+        operation()
+        poll_timer.start()
+
+    def poll():
+        if done() or time.perf_counter() - started[0] > timeout:
+            finished[0] = time.perf_counter()
+            poll_timer.stop()
+            loop.quit()
+
+    poll_timer.timeout.connect(poll)
+    reset_peak_rss()
+    heartbeat_timer.start()
+    QTimer.singleShot(0, start)
+    loop.exec()
+    heartbeat_timer.stop()
+    heartbeat()
+    return {
+        'wall_seconds': round(finished[0] - started[0], 6),
+        'peak_rss_bytes': peak_rss(),
+        'ui_stalls_over_50ms': len(stalls),
+        'max_stall_ms': round(max(stalls, default=0) * 1000, 3),
+    }
+
+
+class Server:
+    def __init__(self, directory):
+        handler = functools.partial(QuietHandler, directory=directory)
+        self.httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.httpd.server_port}/{os.path.basename(path)}"
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def is_loading(window):
+    tab = window.tab
+    return tab.isLoading() or (tab.large_view is not None and tab.large_view.isIndexing())
+
+
+def run_cases(window, path, cases, server, work_dir):
+    results = {}
+    if 'load' in cases:
+        results['load'] = measure(lambda: window.startFileLoad(path), lambda: not is_loading(window))
+    if window.tab.large_file_mode:
+        return results
+    if not window.textEdit.document().characterCount() > 1:
+        window.startFileLoad(path)
+        measure(lambda: None, lambda: not is_loading(window))
+    text = window.textEdit.toPlainText()
+    if 'set_plain_text' in cases:
+        results['set_plain_text'] = measure(lambda: window.textEdit.setPlainText(text))
+    if 'update_status_bar' in cases:
+        def update_status_bar():
+            for _ in range(1000):
+                window.updateStatusBar()
+        results['update_status_bar'] = measure(update_status_bar)
+        results['update_status_bar']['calls'] = 1000
+    del text
+    if 'find_next' in cases or 'replace_all' in cases:
+        window.openFindReplaceDialog()
+        dialog = window.findReplaceDialog
+        dialog.find_input.setText('needle')
+    if 'find_next' in cases:
+        def find_next():
+            for _ in range(100):
+                dialog.find_next()
+        results['find_next'] = measure(find_next)
+        results['find_next']['calls'] = 100
+        results['find_next']['matches'] = len(dialog.starts)
+    if 'replace_all' in cases:
+        dialog.replace_input.setText('pin')
+        results['replace_all'] = measure(dialog.replace_all)
+    if 'find_next' in cases or 'replace_all' in cases:
+        dialog.hide()
+    if 'save' in cases:
+        window.tab.current_file = os.path.join(work_dir, 'saved.txt')
+        results['save'] = measure(window.saveFile, lambda: not window.save_handler.isRunning())
+    if 'web_import' in cases:
+        results['web_import'] = measure(lambda: window.startWebImport(server.url(path)),
+                                        lambda: not is_loading(window))
+    return results
+
+
+def compare(baseline_path, current_path):
+    def index(path):
+        with open(path, 'r', encoding='utf-8') as file:
+            return {(r['case'], r['size'], r['encoding'], r['line_length']): r for r in json.load(file)['results']}
+    baseline, current = index(baseline_path), index(current_path)
+    for key in sorted(current, key=str):
+        if key not in baseline:
+            continue
+        before, after = baseline[key], current[key]
+        ratio = after['wall_seconds'] / before['wall_seconds'] if before['wall_seconds'] else float('inf')
+        flag = '  REGRESSION' if ratio > 1.2 else ''
+        print(f"{key[0]:<18}{key[1]:>12} {key[2]:<8}{key[3]:>6}  {before['wall_seconds']:>10.4f}s -> "
+              f"{after['wall_seconds']:>10.4f}s  x{ratio:.2f}  stalls {before['ui_stalls_over_50ms']} -> "
+              f"{after['ui_stalls_over_50ms']}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Scratchpad's hot paths headlessly.")
+    parser.add_argument('--sizes', default='1K,1M,16M', help="comma-separated corpus sizes, e.g. 1K,1M,1G")
+    parser.add_argument('--encodings', default='utf-8,latin-1,utf-16')
+    parser.add_argument('--line-lengths', default='80,4000')
+    parser.add_argument('--cases', default=','.join(CASES))
+    parser.add_argument('--corpus-dir', help="directory to keep generated corpora between runs")
+    parser.add_argument('--output', help="write the JSON report to this file instead of stdout")
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'),
+                        help="print wall-time ratios between two JSON reports and exit")
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+        return
+    cases = [case for case in args.cases.split(',') if case]
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        corpus_dir = args.corpus_dir or work_dir
+        os.makedirs(corpus_dir, exist_ok=True)
+        QSettings.setPath(QSettings.Format.IniFormat, QSettings.Scope.UserScope, work_dir)
+        scratchpad.encoding_cache = scratchpad.EncodingCache(os.path.join(work_dir, 'encodings.json'))
+        scratchpad.web_cache = scratchpad.WebCache(os.path.join(work_dir, 'web'))
+        app = QApplication.instance() or QApplication(sys.argv[:1])
+        server = Server(corpus_dir)
+        report = {
+            'environment': {
+                'python': platform.python_version(),
+                'qt': QT_VERSION_STR,
+                'pyqt': PYQT_VERSION_STR,
+                'platform': platform.platform(),
+                'qpa': os.environ.get('QT_QPA_PLATFORM'),
+            },
+            'results': [],
+        }
+        for size in map(parse_size, args.sizes.split(',')):
+            for encoding in args.encodings.split(','):
+                for line_length in map(int, args.line_lengths.split(',')):
+                    path = build_corpus(corpus_dir, size, encoding, line_length)
+                    window = scratchpad.Scratchpad()
+                    window.web_import_limit = max(window.web_import_limit, size + 1)
+                    window.show()
+                    for case, result in run_cases(window, path, cases, server, work_dir).items():
+                        report['results'].append(dict(case=case, size=size, encoding=encoding,
+                                                      line_length=line_length,
+                                                      mode='large' if window.tab.large_file_mode else 'editor',
+                                                      **result))
+                        print(f"{case:<18}{size:>12} {encoding:<8}{line_length:>6}  "
+                              f"{result['wall_seconds']:>10.4f}s", file=sys.stderr)
+                    for tab in window.tabs():
+                        window.cancelStreamingLoad(tab)
+                        window.closeLargeFile(tab)
+                        tab.document.setModified(False)
+                    window.close()
+                    window.deleteLater()
+                    app.processEvents()
+        server.httpd.shutdown()
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,46 +1,1069 @@
 """ Import the necessary modules for the program to work """
+import time
+_startup_started = time.perf_counter()
 import sys
 import os
-import requests
-import validators
-import chardet
-from chardet.universaldetector import UniversalDetector
+import io
+import codecs
+import re
+import json
+import hashlib
+import threading
+import queue
+import uuid
+import mmap
+import stat
+import tempfile
+import bisect
+import contextlib
+import functools
+from array import array
+from collections import deque
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QTextEdit,
                              QFileDialog, QMessageBox, QStatusBar, QDialog,
-                             QVBoxLayout, QLabel, QLineEdit, QPushButton, QHBoxLayout)
-from PyQt6.QtCore import QThread, pyqtSignal, Qt, QSettings
-from PyQt6.QtGui import QIcon, QTextCursor, QTextDocument
+                             QVBoxLayout, QLabel, QLineEdit, QPushButton, QHBoxLayout,
+                             QProgressBar, QAbstractScrollArea, QStackedWidget, QInputDialog,
+                             QCheckBox, QTabBar, QWidget)
+from PyQt6.QtCore import (QThread, pyqtSignal, Qt, QSettings, QTimer, QPoint, QStandardPaths,
+                          QLockFile, QObject, QFileSystemWatcher, QThreadPool, QRunnable, QEvent)
+from PyQt6.QtGui import QIcon, QTextCursor, QTextDocument, QFont, QPainter, QColor, QKeySequence
 from PyQt6.QtGui import QAction
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
 
 
-""" Thread for handling file-related operations """
-class FileHandler(QThread):
+ENCODING_SAMPLE_SIZE = 64 * 1024
+
+
+""" Persistent cache of detected encodings keyed by path, size and modification time """
+class EncodingCache:
+    max_entries = 512
+
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path
+        self.entries = None
+        self.lock = threading.Lock()
+
+    def load(self):
+        if self.entries is not None:
+            return
+        if self.cache_path is None:
+            cache_dir = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.GenericCacheLocation)
+            self.cache_path = os.path.join(cache_dir, 'Scratchpad', 'encodings.json')
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as cache_file:
+                self.entries = dict(json.load(cache_file))
+        except (OSError, ValueError, TypeError):
+            self.entries = {}
+
+    def key(self, file_path, file_stat):
+        return f"{os.path.realpath(file_path)}|{file_stat.st_size}|{file_stat.st_mtime_ns}"
+
+    def get(self, file_path, file_stat):
+        with self.lock:
+            self.load()
+            return self.entries.get(self.key(file_path, file_stat))
+
+    def put(self, file_path, file_stat, encoding):
+        with self.lock:
+            self.load()
+            key = self.key(file_path, file_stat)
+            self.entries.pop(key, None)
+            self.entries[key] = encoding
+            while len(self.entries) > self.max_entries:
+                del self.entries[next(iter(self.entries))]
+            try:
+                os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+                temp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+                with open(temp_path, 'w', encoding='utf-8') as cache_file:
+                    json.dump(self.entries, cache_file)
+                os.replace(temp_path, self.cache_path)
+            except OSError:
+                pass
+
+
+encoding_cache = EncodingCache()
+
+
+
+""" Utility function to guess the encoding of the first bytes of a file """
+def sniff_encoding(sample):
+    for bom, name in ((codecs.BOM_UTF32_LE, 'utf-32'), (codecs.BOM_UTF32_BE, 'utf-32'),
+                      (codecs.BOM_UTF8, 'utf-8-sig'), (codecs.BOM_UTF16_LE, 'utf-16'),
+                      (codecs.BOM_UTF16_BE, 'utf-16')):
+        if sample.startswith(bom):
+            return name
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(sample[:ENCODING_SAMPLE_SIZE])
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    return chardet_encoding(sample) or 'utf-8'
+
+
+def chardet_encoding(sample):
+    from chardet import UniversalDetector
+    detector = UniversalDetector()
+    detector.feed(sample)
+    detector.close()
+    return detector.result['encoding']
+
+
+
+""" Utility function to pick an ASCII-compatible encoding for bytes that turned out not to be UTF-8 """
+def legacy_encoding(sample):
+    encoding = chardet_encoding(sample)
+    try:
+        if codecs.lookup(encoding).name not in ('utf-8', 'ascii') and 'a\n'.encode(encoding) == b'a\n':
+            return encoding
+    except (LookupError, TypeError):
+        pass
+    # Latin-1 decodes every byte and writes it back unchanged
+    return 'latin-1'
+
+
+
+""" Incremental decoder for text whose encoding was guessed from a sample at its start
+
+The guess only covers the sample. If a later byte is not valid UTF-8 and everything before it was ASCII,
+any ASCII-compatible encoding decodes that text identically, so decoding switches to a legacy encoding.
+Any other undecodable byte raises, or with errors='replace' becomes U+FFFD and marks the text lossy.
+"""
+class FallbackDecoder:
+    def __init__(self, encoding, errors='strict', translate=False):
+        self.errors = errors
+        self.translate = translate
+        self.lossy = False
+        self.ascii_only = True
+        self.setEncoding(encoding, (b'', 0))
+
+    def setEncoding(self, encoding, state):
+        self.encoding = encoding
+        self.codec = codecs.getincrementaldecoder(encoding)(errors='strict')
+        self.decoder = io.IncrementalNewlineDecoder(self.codec, translate=True) if self.translate else self.codec
+        self.decoder.setstate(state)
+
+    def getstate(self):
+        return self.decoder.getstate()
+
+    def decode(self, chunk):
+        try:
+            text = self.decoder.decode(chunk)
+        except UnicodeDecodeError as e:
+            pending, flag = self.decoder.getstate()
+            data = pending + chunk
+            if self.ascii_only and codecs.lookup(self.encoding).name == 'utf-8' and data[:e.start].isascii():
+                self.setEncoding(legacy_encoding(data), (b'', flag & 1))
+                return self.decode(data)
+            if self.errors != 'replace':
+                raise
+            self.replaceErrors()
+            text = self.decoder.decode(chunk)
+        self.ascii_only = self.ascii_only and text.isascii()
+        return text
+
+    def flush(self):
+        # All that is left is a sequence cut off by the end of the data, which says nothing about the
+        # encoding, so it is never a reason to switch to a legacy one
+        try:
+            return self.decoder.decode(b'', True)
+        except UnicodeDecodeError:
+            if self.errors != 'replace':
+                raise
+            self.replaceErrors()
+            return self.decoder.decode(b'', True)
+
+    def replaceErrors(self):
+        self.lossy = True
+        self.codec.errors = 'replace'
+
+
+
+""" Utility function to detect the encoding of a file """
+def detect_encoding(file_path, sample=None):
+    file_stat = os.stat(file_path)
+    encoding = encoding_cache.get(file_path, file_stat)
+    if encoding is None:
+        if sample is None:
+            with open(file_path, 'rb') as file:
+                sample = file.read(ENCODING_SAMPLE_SIZE)
+        encoding = sniff_encoding(sample)
+        encoding_cache.put(file_path, file_stat, encoding)
+    return encoding
+
+
+
+# bzip2 is 'BZh', a block size digit, then the magic of the first block or of the end of an empty stream
+COMPRESSION_MAGIC = ((re.compile(rb'\x1f\x8b'), 'gzip'), (re.compile(rb'BZh[1-9](1AY&SY|\x17rE8P\x90)'), 'bz2'),
+                     (re.compile(rb'\xfd7zXZ\x00'), 'xz'))
+COMPRESSION_HEADER_SIZE = 10
+COMPRESSION_SUFFIXES = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'xz'}
+
+
+""" Utility function to recognise gzip, bz2 and xz data by its magic bytes """
+def sniff_compression(header):
+    for magic, compression in COMPRESSION_MAGIC:
+        if magic.match(header):
+            return compression
+    return None
+
+
+def file_compression(file_path):
+    try:
+        with open(file_path, 'rb') as file:
+            return sniff_compression(file.read(COMPRESSION_HEADER_SIZE))
+    except OSError:
+        return None
+
+
+""" Utility function to wrap an open binary file in a streaming decompressor or compressor
+
+Closing the wrapper finishes the stream but leaves the underlying file open.
+"""
+def compression_stream(file, compression, mode='rb'):
+    if compression is None:
+        return contextlib.nullcontext(file)
+    if compression == 'gzip':
+        import gzip
+        return gzip.GzipFile(fileobj=file, mode=mode)
+    if compression == 'bz2':
+        import bz2
+        return bz2.BZ2File(file, mode)
+    import lzma
+    return lzma.LZMAFile(file, mode)
+
+
+
+""" Utility function to open a file at its start for reading through its decompressor
+
+Magic bytes can begin a plain-text file too, so if the decompressor rejects the first read the file is
+read as it is. Returns the compression in effect, the stream and the first chunk read from it.
+"""
+def open_compressed(raw, compression, size):
+    if compression is not None:
+        stream = compression_stream(raw, compression)
+        try:
+            return compression, stream, stream.read(size)
+        except Exception:
+            # gzip and bz2 raise OSError or EOFError on data that is not theirs, xz its own LZMAError
+            stream.close()
+            raw.seek(0)
+    return None, contextlib.nullcontext(raw), raw.read(size)
+
+
+
+""" Thread for building the line-offset index of a memory-mapped file """
+class LineIndexer(QThread):
+    lines_indexed = pyqtSignal(int)
+
+    block_size = 16 * 1024 * 1024
+
+    def __init__(self, mapping, newline, start=0, offsets=None):
+        super().__init__()
+        self.mapping = mapping
+        self.newline = newline
+        self.start_offset = start
+        self.offsets = offsets if offsets is not None else array('q', [start])
+        self.complete = False
+
+    def run(self):
+        find = self.mapping.find
+        append = self.offsets.append
+        newline = self.newline
+        unit = len(newline)
+        size = len(self.mapping)
+        pos = self.start_offset
+        while pos < size:
+            if self.isInterruptionRequested():
+                return
+            end = min(pos + self.block_size, size)
+            limit = min(end + unit - 1, size)
+            i = find(newline, pos, limit)
+            while i != -1:
+                if (i - self.start_offset) % unit:
+                    i = find(newline, i + 1, limit)
+                    continue
+                append(i + unit)
+                i = find(newline, i + unit, limit)
+            pos = max(end, self.offsets[-1])
+            self.lines_indexed.emit(len(self.offsets))
+        self.complete = True
+        self.lines_indexed.emit(len(self.offsets))
+
+
+
+""" Thread for searching a memory-mapped file """
+class LargeFileSearch(QThread):
+    match_found = pyqtSignal(int)
+
+    block_size = 64 * 1024 * 1024
+
+    def __init__(self, mapping, pattern, start):
+        super().__init__()
+        self.mapping = mapping
+        self.pattern = pattern
+        self.start_offset = start
+
+    def run(self):
+        size = len(self.mapping)
+        for lo, hi in ((self.start_offset, size), (0, min(self.start_offset + len(self.pattern), size))):
+            pos = lo
+            while pos < hi:
+                if self.isInterruptionRequested():
+                    return
+                end = min(pos + self.block_size, hi)
+                found = self.mapping.find(self.pattern, pos, min(end + len(self.pattern) - 1, hi))
+                if found != -1:
+                    self.match_found.emit(found)
+                    return
+                pos = end
+        self.match_found.emit(-1)
+
+
+
+""" Read-only viewport that renders only the visible lines of a memory-mapped file """
+class LargeFileView(QAbstractScrollArea):
+    current_line_changed = pyqtSignal(int)
+    index_progress = pyqtSignal(int)
+
+    max_line_bytes = 64 * 1024
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.file = None
+        self.mapping = None
+        self.indexer = None
+        self.searcher = None
+        self.pending_match = None
+        self.pending_line = None
+        self.encoding = 'utf-8'
+        self.unit = 1
+        self.current_line = 0
+        self.max_width = 0
+        self.setFont(QFont(['Cascadia Code', 'Courier New', 'monospace'], 11))
+        self.viewport().setCursor(Qt.CursorShape.IBeamCursor)
+
+    def open(self, file_path, encoding):
+        self.close()
+        self.file = open(file_path, 'rb')
+        self.mapping = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        head = self.mapping[:4]
+        start = 0
+        encoding = codecs.lookup(encoding).name
+        for bom, name in ((codecs.BOM_UTF32_LE, 'utf-32-le'), (codecs.BOM_UTF32_BE, 'utf-32-be'),
+                          (codecs.BOM_UTF8, 'utf-8'), (codecs.BOM_UTF16_LE, 'utf-16-le'),
+                          (codecs.BOM_UTF16_BE, 'utf-16-be')):
+            if head.startswith(bom):
+                encoding, start = name, len(bom)
+                break
+        else:
+            if encoding in ('utf-16', 'utf-32'):
+                encoding += '-le'
+        self.encoding = encoding
+        self.newline = '\n'.encode(encoding)
+        self.unit = len(self.newline)
+        self.current_line = 0
+        self.max_width = 0
+        self.pinned_to_bottom = False
+        self.indexer = LineIndexer(self.mapping, self.newline, start)
+        self.indexer.lines_indexed.connect(self.onLinesIndexed)
+        self.indexer.start()
+        self.verticalScrollBar().setValue(0)
+        self.horizontalScrollBar().setValue(0)
+        self.updateScrollBars()
+        self.viewport().update()
+
+    def extend(self):
+        if self.file is None or os.fstat(self.file.fileno()).st_size <= len(self.mapping):
+            return
+        vbar = self.verticalScrollBar()
+        self.pinned_to_bottom = vbar.value() >= vbar.maximum()
+        for worker in (self.searcher, self.indexer):
+            if worker is not None:
+                worker.requestInterruption()
+                worker.wait()
+        self.searcher = None
+        offsets = self.indexer.offsets
+        self.mapping.close()
+        self.mapping = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.indexer = LineIndexer(self.mapping, self.newline, offsets[-1], offsets)
+        self.indexer.lines_indexed.connect(self.onLinesIndexed)
+        self.indexer.start()
+
+    def close(self):
+        for worker in (self.searcher, self.indexer):
+            if worker is not None:
+                worker.requestInterruption()
+                worker.wait()
+        self.searcher = None
+        self.indexer = None
+        self.pending_match = None
+        self.pending_line = None
+        if self.mapping is not None:
+            self.mapping.close()
+            self.mapping = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def isIndexing(self):
+        return self.indexer is not None and not self.indexer.complete
+
+    def lineCount(self):
+        if self.indexer is None:
+            return 0
+        if self.indexer.complete:
+            return len(self.indexer.offsets)
+        return len(self.indexer.offsets) - 1
+
+    def lineText(self, line):
+        offsets = self.indexer.offsets
+        start = offsets[line]
+        if line + 1 < len(offsets):
+            end = offsets[line + 1] - self.unit
+        else:
+            end = len(self.mapping)
+        end = min(end, start + self.max_line_bytes)
+        text = self.mapping[start:end].decode(self.encoding, errors='replace')
+        if text.endswith('\r'):
+            text = text[:-1]
+        return text.expandtabs(8)
+
+    def lineAtOffset(self, offset):
+        return bisect.bisect_right(self.indexer.offsets, offset) - 1
+
+    def visibleRows(self):
+        return max(1, self.viewport().height() // self.fontMetrics().lineSpacing())
+
+    def onLinesIndexed(self, count):
+        self.updateScrollBars()
+        if self.pinned_to_bottom:
+            self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
+        self.viewport().update()
+        self.index_progress.emit(count)
+        if self.pending_match is not None and (self.indexer.complete or self.pending_match < self.indexer.offsets[-1]):
+            offset, self.pending_match = self.pending_match, None
+            self.goToLine(self.lineAtOffset(offset))
+        if self.pending_line is not None and (self.indexer.complete or self.pending_line < self.lineCount()):
+            self.goToLine(self.pending_line)
+
+    def updateScrollBars(self):
+        rows = self.visibleRows()
+        vbar = self.verticalScrollBar()
+        vbar.setRange(0, max(0, self.lineCount() - rows))
+        vbar.setPageStep(rows)
+        vbar.setSingleStep(1)
+        hbar = self.horizontalScrollBar()
+        hbar.setRange(0, max(0, self.max_width - self.viewport().width()))
+        hbar.setPageStep(self.viewport().width())
+        hbar.setSingleStep(self.fontMetrics().horizontalAdvance(' ') * 4)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.updateScrollBars()
+
+    def scrollContentsBy(self, dx, dy):
+        self.viewport().update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        painter.fillRect(event.rect(), self.palette().base())
+        if self.mapping is None:
+            return
+        metrics = self.fontMetrics()
+        spacing = metrics.lineSpacing()
+        first = self.verticalScrollBar().value()
+        x = 4 - self.horizontalScrollBar().value()
+        count = self.lineCount()
+        widest = self.max_width
+        for row in range(self.visibleRows() + 1):
+            line = first + row
+            if line >= count:
+                break
+            y = row * spacing
+            if line == self.current_line:
+                painter.fillRect(0, y, self.viewport().width(), spacing, self.palette().alternateBase())
+            text = self.lineText(line)
+            painter.drawText(x, y + metrics.ascent(), text)
+            widest = max(widest, metrics.horizontalAdvance(text) + 8)
+        if widest != self.max_width:
+            self.max_width = widest
+            self.updateScrollBars()
+
+    def setCurrentLine(self, line):
+        self.pending_line = None
+        line = max(0, min(line, self.lineCount() - 1))
+        if line != self.current_line:
+            self.current_line = line
+            self.current_line_changed.emit(line)
+        vbar = self.verticalScrollBar()
+        rows = self.visibleRows()
+        if line < vbar.value():
+            vbar.setValue(line)
+        elif line >= vbar.value() + rows:
+            vbar.setValue(line - rows + 1)
+        self.viewport().update()
+
+    def goToLine(self, line):
+        self.verticalScrollBar().setValue(line - self.visibleRows() // 2)
+        self.setCurrentLine(line)
+        if line >= self.lineCount() and self.isIndexing():
+            # Jump again once the indexer has reached the requested line
+            self.pending_line = line
+
+    def mousePressEvent(self, event):
+        line = self.verticalScrollBar().value() + int(event.position().y()) // self.fontMetrics().lineSpacing()
+        self.setCurrentLine(line)
+
+    def keyPressEvent(self, event):
+        key = event.key()
+        rows = self.visibleRows()
+        control = event.modifiers() & Qt.KeyboardModifier.ControlModifier
+        if key == Qt.Key.Key_Up:
+            self.setCurrentLine(self.current_line - 1)
+        elif key == Qt.Key.Key_Down:
+            self.setCurrentLine(self.current_line + 1)
+        elif key == Qt.Key.Key_PageUp:
+            self.setCurrentLine(self.current_line - rows)
+        elif key == Qt.Key.Key_PageDown:
+            self.setCurrentLine(self.current_line + rows)
+        elif key == Qt.Key.Key_Home and control:
+            self.setCurrentLine(0)
+        elif key == Qt.Key.Key_End and control:
+            self.setCurrentLine(self.lineCount() - 1)
+        else:
+            super().keyPressEvent(event)
+
+    def findNext(self, text):
+        if self.mapping is None or not text:
+            return
+        if self.searcher is not None:
+            self.searcher.requestInterruption()
+            self.searcher.wait()
+        if self.current_line + 1 < len(self.indexer.offsets):
+            start = self.indexer.offsets[self.current_line + 1]
+        else:
+            start = self.indexer.offsets[self.current_line]
+        self.searcher = LargeFileSearch(self.mapping, text.encode(self.encoding), start)
+        self.searcher.match_found.connect(self.onMatchFound)
+        self.searcher.start()
+
+    def onMatchFound(self, offset):
+        if offset == -1:
+            QMessageBox.information(self, "Not Found", "No occurrences found.")
+        elif self.isIndexing() and offset >= self.indexer.offsets[-1]:
+            self.pending_match = offset
+        else:
+            self.goToLine(self.lineAtOffset(offset))
+
+
+
+""" Utility function to wait for a free slot in a loader's chunk window; False if the load was cancelled
+
+The GUI frees a slot once it has inserted a chunk, so a loader never runs more than a few chunks ahead of
+the event loop and a fast disk or network cannot flood it with queued signals.
+"""
+def acquire_chunk_slot(slots, cancelled):
+    while not slots.acquire(timeout=0.1):
+        if cancelled():
+            return False
+    return True
+
+
+
+""" Signals of a FileLoadTask, which as a QRunnable cannot declare its own """
+class FileLoadSignals(QObject):
+    file_load_started = pyqtSignal(str, int)
     file_content_loaded = pyqtSignal(str, str)
+    file_load_progress = pyqtSignal(int, int)
+    file_load_finished = pyqtSignal(bool)
+    file_load_failed = pyqtSignal(str)
+
+
+""" Task that streams a file into a document on the main window's bounded loader pool """
+class FileLoadTask(QRunnable):
+    chunk_size = 1024 * 1024
+    chunk_window = 2
+
+    def __init__(self, file_path, follow=False):
+        super().__init__()
+        self.file_path = file_path
+        self.follow = follow
+        self.signals = FileLoadSignals()
+        self.cancelled = threading.Event()
+        self.chunk_slots = threading.Semaphore(self.chunk_window)
+        self.end_offset = 0
+        self.decoder_state = None
+        self.inode = None
+        self.compression = None
+        self.encoding = None
+        self.lossy = False
+        self.decoder = None
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self):
+        signals = self.signals
+        try:
+            if self.cancelled.is_set():
+                signals.file_load_finished.emit(False)
+                return
+            total = os.path.getsize(self.file_path)
+            loaded = 0
+            with open(self.file_path, 'rb') as raw:
+                self.inode = os.fstat(raw.fileno()).st_ino
+                self.compression = sniff_compression(raw.read(COMPRESSION_HEADER_SIZE))
+                raw.seek(0)
+                self.compression, stream, chunk = open_compressed(raw, self.compression, self.chunk_size)
+                with stream as file:
+                    with instrumentation.span('load: detect'):
+                        detected = self.encoding = detect_encoding(self.file_path, chunk[:ENCODING_SAMPLE_SIZE])
+                    self.decoder = FallbackDecoder(detected, errors='replace', translate=True)
+                    signals.file_load_started.emit(detected, total)
+                    while chunk:
+                        if self.cancelled.is_set():
+                            signals.file_load_finished.emit(False)
+                            return
+                        # Progress counts bytes read from disk, which for compressed files is not len(chunk)
+                        loaded = raw.tell()
+                        with instrumentation.span('load: decode'):
+                            text = self.decoder.decode(chunk)
+                        if text and not acquire_chunk_slot(self.chunk_slots, self.cancelled.is_set):
+                            signals.file_load_finished.emit(False)
+                            return
+                        with instrumentation.span('load: emit'):
+                            if text:
+                                signals.file_content_loaded.emit(text, self.decoder.encoding)
+                            signals.file_load_progress.emit(loaded, total)
+                        chunk = file.read(self.chunk_size)
+            self.end_offset = loaded
+            pending, flag = self.decoder.getstate()
+            if self.follow:
+                # A followed file is still being written, so a CR or part of a character at its end stays
+                # pending in the saved state and is only decoded once the rest is appended
+                self.decoder_state = (pending, flag)
+                text = ''
+            else:
+                # Following later resumes from the saved state, which is only right if the flush emits nothing
+                self.decoder_state = (pending, flag) if not pending and not flag & 1 else None
+                text = self.decoder.flush()
+            self.encoding = self.decoder.encoding
+            self.lossy = self.decoder.lossy
+            if text:
+                if not acquire_chunk_slot(self.chunk_slots, self.cancelled.is_set):
+                    signals.file_load_finished.emit(False)
+                    return
+                signals.file_content_loaded.emit(text, self.encoding)
+            if self.encoding != detected:
+                encoding_cache.put(self.file_path, os.stat(self.file_path), self.encoding)
+            signals.file_load_finished.emit(True)
+        except Exception as e:
+            signals.file_load_failed.emit(f"Error reading file: {e}")
+
+
+""" Raised inside atomic_write() to drop the temporary file and leave the original untouched """
+class WriteDiscarded(Exception):
+    pass
+
+
+
+""" Utility function to write a file through a temporary sibling that atomically replaces it """
+@contextlib.contextmanager
+def atomic_write(file_path):
+    target = os.path.realpath(file_path)
+    directory = os.path.dirname(target)
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(target)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        try:
+            mode = stat.S_IMODE(os.stat(target).st_mode)
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, target)
+    except WriteDiscarded:
+        os.unlink(temp_path)
+        return
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(temp_path)
+        raise
+    if hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+""" Thread for saving files """
+class FileHandler(QThread):
+    file_save_progress = pyqtSignal(int, int)
+    file_encoding_error = pyqtSignal(str)
     file_saved = pyqtSignal(bool)
 
-    def __init__(self, file_path):
+    chunk_size = 1024 * 1024
+
+    def __init__(self, file_path, content, encoding, compression=None):
         super().__init__()
         self.file_path = file_path
+        self.content = content
+        self.encoding = encoding
+        self.compression = compression
+        self.error = None
 
     def run(self):
-            detector = chardet.universaldetector.UniversalDetector()
-            try:
-                with open(self.file_path, 'rb') as file:
-                    while chunk := file.read(1024):
-                        detector.feed(chunk)
-                        if detector.done:
-                            break
-                    detector.close()
-                encoding = detector.result['encoding'] or 'utf-8'
-                with open(self.file_path, 'r', encoding=encoding, errors='replace') as file:
-                    content = ""
-                    chunk_size = 1024 * 1024
-                    while chunk := file.read(chunk_size):
-                        content += chunk
-                        self.file_content_loaded.emit(content, encoding)
-                self.file_content_loaded.emit(content, encoding)
-            except Exception as e:
-                self.file_content_loaded.emit(f"Error reading file: {e}", '')
+        with instrumentation.span('save'):
+            self.saveFile()
+
+    def saveFile(self):
+        content = self.content
+        total = len(content)
+        try:
+            encoder = codecs.getincrementalencoder(self.encoding)(errors='strict')
+            with atomic_write(self.file_path) as raw, compression_stream(raw, self.compression, 'wb') as file:
+                for start in range(0, total, self.chunk_size):
+                    chunk = content[start:start + self.chunk_size]
+                    if os.linesep != '\n':
+                        chunk = chunk.replace('\n', os.linesep)
+                    file.write(encoder.encode(chunk))
+                    self.file_save_progress.emit(min(start + self.chunk_size, total), total)
+                file.write(encoder.encode('', final=True))
+        except UnicodeEncodeError:
+            self.file_encoding_error.emit(self.encoding)
+            return
+        except Exception as e:
+            self.error = e
+            self.file_saved.emit(False)
+            return
+        self.file_saved.emit(True)
+
+
+
+""" Watches a followed file and reports appended bytes, truncation and rotation """
+class FileFollower(QObject):
+    file_grew = pyqtSignal(int)
+    file_replaced = pyqtSignal()
+    poll_interval = 1000
+
+    def __init__(self, file_path, offset, inode, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.offset = self.start_offset = offset
+        self.inode = inode
+        self.paused = False
+        self.watcher = QFileSystemWatcher([file_path], self)
+        self.watcher.fileChanged.connect(self.check)
+        # Some filesystems (network shares, rotated paths) never notify, so poll as well
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.poll_interval)
+        self.timer.timeout.connect(self.check)
+        self.timer.start()
+
+    def check(self):
+        if self.paused:
+            return
+        try:
+            file_stat = os.stat(self.file_path)
+        except OSError:
+            return
+        if self.file_path not in self.watcher.files():
+            self.watcher.addPath(self.file_path)
+        if file_stat.st_ino != self.inode or file_stat.st_size < self.offset:
+            self.file_replaced.emit()
+        elif file_stat.st_size > self.offset:
+            self.file_grew.emit(file_stat.st_size)
+
+    def pause(self):
+        self.paused = True
+        self.timer.stop()
+
+    def resume(self):
+        self.paused = False
+        self.timer.start()
+        self.check()
+
+    def stop(self):
+        self.timer.stop()
+        self.watcher.removePaths(self.watcher.files())
+
+
+""" Thread for recounting document statistics in the background """
+class StatsCounter(QThread):
+    words_counted = pyqtSignal(int, int)
+
+    def __init__(self, text, generation):
+        super().__init__()
+        self.text = text
+        self.generation = generation
+
+    def run(self):
+        self.words_counted.emit(len(self.text.split()), self.generation)
+
+
+
+""" Per-phase timings printed by --startup-profile """
+class StartupProfile:
+    def __init__(self):
+        self.phases = []
+        self.last = _startup_started
+        self.reported = False
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self):
+        if self.reported:
+            return
+        self.reported = True
+        for phase, seconds in self.phases:
+            print(f"{phase:<18}{seconds * 1000:>10.1f} ms")
+        print(f"{'total':<18}{(self.last - _startup_started) * 1000:>10.1f} ms")
+
+
+
+""" Fixed-size ring buffers of hot-path timings shown in Help > Performance """
+class Instrumentation:
+    capacity = 4096
+    heartbeat_interval = 50
+    histogram_bounds = [(100_000, '< 0.1 ms'), (1_000_000, '< 1 ms'), (10_000_000, '< 10 ms'),
+                        (100_000_000, '< 100 ms'), (1_000_000_000, '< 1 s'), (None, '>= 1 s')]
+
+    def __init__(self):
+        self.enabled = False
+        self.origin = time.perf_counter_ns()
+        self.samples = {}
+        self.heartbeat_timer = None
+        self.heartbeat_expected = 0
+
+    def setEnabled(self, enabled):
+        self.enabled = enabled
+        if self.heartbeat_timer is None:
+            self.heartbeat_timer = QTimer()
+            self.heartbeat_timer.setTimerType(Qt.TimerType.PreciseTimer)
+            self.heartbeat_timer.setInterval(self.heartbeat_interval)
+            self.heartbeat_timer.timeout.connect(self.heartbeat)
+        if enabled:
+            self.heartbeat_expected = time.perf_counter_ns() + self.heartbeat_interval * 1_000_000
+            self.heartbeat_timer.start()
+        else:
+            self.heartbeat_timer.stop()
+
+    def heartbeat(self):
+        # How late the timer fires is how long the GUI event loop was blocked
+        now = time.perf_counter_ns()
+        self.record('event loop latency', self.heartbeat_expected, max(0, now - self.heartbeat_expected))
+        self.heartbeat_expected = now + self.heartbeat_interval * 1_000_000
+
+    def span(self, name):
+        # Disabled spans cost one attribute check and a shared no-op context manager
+        if not self.enabled:
+            return _null_span
+        return InstrumentationSpan(self, name)
+
+    def record(self, name, start, duration):
+        buffer = self.samples.get(name)
+        if buffer is None:
+            buffer = self.samples.setdefault(name, deque(maxlen=self.capacity))
+        buffer.append((start, duration, threading.get_ident()))
+
+    def clear(self):
+        self.samples = {}
+
+    def snapshot(self):
+        return {name: list(buffer) for name, buffer in list(self.samples.items())}
+
+    def summary(self, snapshot=None):
+        rows = []
+        for name, samples in sorted((snapshot or self.snapshot()).items()):
+            durations = sorted(sample[1] for sample in samples)
+            if not durations:
+                continue
+            histogram = [0] * len(self.histogram_bounds)
+            for duration in durations:
+                histogram[next(index for index, (bound, label) in enumerate(self.histogram_bounds)
+                               if bound is None or duration < bound)] += 1
+            rows.append({
+                'name': name,
+                'count': len(durations),
+                'mean_ms': sum(durations) / len(durations) / 1e6,
+                'p50_ms': durations[len(durations) // 2] / 1e6,
+                'p95_ms': durations[min(len(durations) - 1, len(durations) * 95 // 100)] / 1e6,
+                'max_ms': durations[-1] / 1e6,
+                'histogram': dict(zip((label for bound, label in self.histogram_bounds), histogram)),
+            })
+        return rows
+
+    def slowest(self, limit=20, snapshot=None):
+        calls = [(duration, name, start) for name, samples in (snapshot or self.snapshot()).items()
+                 for start, duration, thread in samples]
+        return sorted(calls, reverse=True)[:limit]
+
+    def toJson(self):
+        snapshot = self.snapshot()
+        return {
+            'capacity': self.capacity,
+            'summary': self.summary(snapshot),
+            'samples': {name: [{'start_us': (start - self.origin) / 1000, 'duration_us': duration / 1000,
+                                'thread': thread} for start, duration, thread in samples]
+                        for name, samples in snapshot.items()},
+        }
+
+    def toChromeTrace(self):
+        pid = os.getpid()
+        events = [{'name': name, 'ph': 'X', 'ts': (start - self.origin) / 1000, 'dur': duration / 1000,
+                   'pid': pid, 'tid': thread}
+                  for name, samples in self.snapshot().items() for start, duration, thread in samples]
+        events.sort(key=lambda event: event['ts'])
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+class InstrumentationSpan:
+    __slots__ = ('instrumentation', 'name', 'start')
+
+    def __init__(self, instrumentation, name):
+        self.instrumentation = instrumentation
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.instrumentation.record(self.name, self.start, time.perf_counter_ns() - self.start)
+        return False
+
+
+_null_span = contextlib.nullcontext()
+instrumentation = Instrumentation()
+
+
+""" Decorator that times every call of a function as one span
+
+Surplus positional arguments are dropped the way PyQt drops them for slots, so a decorated
+method can still be connected to a signal that passes more arguments than it takes.
+"""
+def timed(name):
+    def decorate(function):
+        argument_count = function.__code__.co_argcount
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not instrumentation.enabled:
+                return function(*args[:argument_count], **kwargs)
+            with InstrumentationSpan(instrumentation, name):
+                return function(*args[:argument_count], **kwargs)
+        return wrapper
+    return decorate
+
+
+""" Dialog showing the timings collected by the instrumentation layer """
+class PerformanceDialog(QDialog):
+    refresh_interval = 1000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Performance")
+        self.setModal(False)
+        self.resize(720, 520)
+        layout = QVBoxLayout()
+        self.record_checkbox = QCheckBox("Record timings", self)
+        self.record_checkbox.setChecked(instrumentation.enabled)
+        self.record_checkbox.toggled.connect(instrumentation.setEnabled)
+        layout.addWidget(self.record_checkbox)
+        self.report_view = QTextEdit(self)
+        self.report_view.setReadOnly(True)
+        self.report_view.setLineWrapMode(QTextEdit.LineWrapMode.NoWrap)
+        self.report_view.setFont(QFont(['Cascadia Code', 'Courier New', 'monospace'], 10))
+        layout.addWidget(self.report_view)
+        buttons = QHBoxLayout()
+        clear_button = QPushButton("Clear", self)
+        clear_button.clicked.connect(self.clear)
+        buttons.addWidget(clear_button)
+        export_json_button = QPushButton("Export JSON...", self)
+        export_json_button.clicked.connect(lambda: self.export("JSON Files (*.json)", instrumentation.toJson))
+        buttons.addWidget(export_json_button)
+        export_trace_button = QPushButton("Export Chrome Trace...", self)
+        export_trace_button.clicked.connect(lambda: self.export("Chrome Trace Files (*.json)", instrumentation.toChromeTrace))
+        buttons.addWidget(export_trace_button)
+        close_button = QPushButton("Close", self)
+        close_button.clicked.connect(self.close)
+        buttons.addWidget(close_button)
+        layout.addLayout(buttons)
+        self.setLayout(layout)
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(self.refresh_interval)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.record_checkbox.setChecked(instrumentation.enabled)
+        self.refresh()
+        self.refresh_timer.start()
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def undoReport(self):
+        tabs = self.parent().tabs() if hasattr(self.parent(), 'tabs') else []
+        lines = [f"{'Undo history':<22}{'Steps':>8}{'MiB':>11}{'Budget':>11}{'Dropped':>11}{'Spilled':>11}"]
+        for tab in tabs:
+            history = tab.undo_history
+            if history is None:
+                continue
+            lines.append(f"{tab.title()[:21]:<22}{len(history.steps):>8}{history.total / 1048576:>11.2f}"
+                         f"{history.budget / 1048576:>11.0f}{history.dropped:>11}{len(history.checkpoints):>11}")
+        return lines
+
+    def refresh(self):
+        if not instrumentation.enabled and not instrumentation.samples:
+            lines = ["Recording is off. Tick \"Record timings\" and reproduce the stutter.", ""] + self.undoReport()
+            self.report_view.setPlainText('\n'.join(lines))
+            return
+        snapshot = instrumentation.snapshot()
+        lines = self.undoReport() + [""]
+        lines.append(f"{'Operation':<22}{'Count':>8}{'Mean ms':>11}{'p50 ms':>11}{'p95 ms':>11}{'Max ms':>11}")
+        rows = instrumentation.summary(snapshot)
+        for row in rows:
+            lines.append(f"{row['name']:<22}{row['count']:>8}{row['mean_ms']:>11.3f}{row['p50_ms']:>11.3f}"
+                         f"{row['p95_ms']:>11.3f}{row['max_ms']:>11.3f}")
+        for row in rows:
+            lines.append("")
+            lines.append(row['name'])
+            widest = max(row['histogram'].values())
+            for label, count in row['histogram'].items():
+                bar = '#' * (round(count * 40 / widest) if count else 0)
+                lines.append(f"  {label:>10} {count:>7} {bar}")
+        lines.append("")
+        lines.append("Slowest recent calls")
+        now = time.perf_counter_ns()
+        for duration, name, start in instrumentation.slowest(snapshot=snapshot):
+            lines.append(f"  {duration / 1e6:>11.3f} ms  {name:<22}{(now - start) / 1e9:>8.1f} s ago")
+        scroll = self.report_view.verticalScrollBar().value()
+        self.report_view.setPlainText('\n'.join(lines))
+        self.report_view.verticalScrollBar().setValue(scroll)
+
+    def clear(self):
+        instrumentation.clear()
+        self.refresh()
+
+    def export(self, file_filter, build):
+        file_name, _ = QFileDialog.getSaveFileName(self, "Export Timings", "", file_filter)
+        if not file_name:
+            return
+        try:
+            with open(file_name, 'w', encoding='utf-8') as file:
+                json.dump(build(), file)
+        except OSError as e:
+            QMessageBox.warning(self, "Error", f"Failed to export timings: {e}")
 
 
 
@@ -55,14 +1078,26 @@ def load_icon(icon_name):
 
 
 
+""" Utility function to read a stylesheet, reusing the text while the file is unchanged """
+_stylesheet_cache = {}
+
+def readStyle(css_path):
+    mtime = os.stat(css_path).st_mtime_ns
+    cached = _stylesheet_cache.get(css_path)
+    if cached is None or cached[0] != mtime:
+        with open(css_path, 'r') as css_file:
+            cached = _stylesheet_cache[css_path] = (mtime, css_file.read())
+    return cached[1]
+
+
+
 """ Utility function to load CSS stylesheet """
 def loadStyle():
     user_css_path = os.path.join(os.path.expanduser("~"), "spstyle.css")
     stylesheet = None
     if os.path.exists(user_css_path):
         try:
-            with open(user_css_path, 'r') as css_file:
-                stylesheet = css_file.read()
+            stylesheet = readStyle(user_css_path)
             print(f"Loaded user CSS style from: {user_css_path}")
         except Exception as e:
             print(f"Error loading user CSS: {e}")
@@ -71,8 +1106,7 @@ def loadStyle():
         if getattr(sys, 'frozen', False):
             css_file_path = os.path.join(sys._MEIPASS, 'style.css')
         try:
-            with open(css_file_path, 'r') as css_file:
-                stylesheet = css_file.read()
+            stylesheet = readStyle(css_file_path)
         except FileNotFoundError:
             print(f"Default CSS file not found: {css_file_path}")
     if stylesheet:
@@ -84,10 +1118,93 @@ def loadStyle():
 
 
 
+""" Utility function to compile the pattern used by the search engine """
+def compile_search_pattern(text, regex=False, case_sensitive=False, whole_word=False):
+    pattern = text if regex else re.escape(text)
+    if whole_word:
+        pattern = rf"(?<!\w)(?:{pattern})(?!\w)"
+    flags = re.MULTILINE
+    if not case_sensitive:
+        flags |= re.IGNORECASE
+    return re.compile(pattern, flags)
+
+
+
+ASTRAL_PATTERN = re.compile('[\U00010000-\U0010ffff]')
+# \A and \Z cannot span lines, but in a rescanned segment they would match at the segment's ends
+LINE_BREAK_TOKENS = ('\n', '\\n', '\\s', '\\W', '\\D', '\\t', '\\x', '\\0', '\\u', '\\U', '\\N', '[^', '\\A', '\\Z')
+# Inline flags, global like (?s) or scoped like (?is:...) and (?-m:...)
+INLINE_FLAGS = re.compile(r'\(\?([aiLmsux]*(?:-[imsx]*)?)[:)]')
+
+
+""" Utility function to list the offsets of the characters that take two UTF-16 units in a QTextDocument """
+def astral_offsets(text):
+    if text.isascii():
+        return None
+    return array('q', (match.start() for match in ASTRAL_PATTERN.finditer(text))) or None
+
+
+""" Utility function to convert a string offset into a document position """
+def document_position(astral, offset):
+    return offset + bisect.bisect_left(astral, offset) if astral else offset
+
+
+""" Utility function to tell whether a search pattern might match across a line break """
+def spans_lines(pattern):
+    return (bool(pattern.flags & re.DOTALL) or any(token in pattern.pattern for token in LINE_BREAK_TOKENS)
+            or any('s' in flags or 'm' in flags for flags in INLINE_FLAGS.findall(pattern.pattern)))
+
+
+""" Utility function to collect the document positions of every non-empty match in a text """
+def scan_matches(pattern, text, base=0, thread=None):
+    starts = array('q')
+    ends = array('q')
+    astral = astral_offsets(text)
+    for match in pattern.finditer(text):
+        start, end = match.span()
+        if start == end:
+            continue
+        if astral:
+            start, end = document_position(astral, start), document_position(astral, end)
+        starts.append(base + start)
+        ends.append(base + end)
+        if thread is not None and not len(starts) & 0xFFF and thread.isInterruptionRequested():
+            return None
+    return starts, ends
+
+
+
+""" Thread for indexing every match of a pattern in the document """
+class SearchEngine(QThread):
+    search_finished = pyqtSignal(int)
+
+    def __init__(self, text, pattern, generation):
+        super().__init__()
+        self.text = text
+        self.pattern = pattern
+        self.generation = generation
+        self.starts = None
+        self.ends = None
+
+    def run(self):
+        with instrumentation.span('search index'):
+            result = scan_matches(self.pattern, self.text, thread=self)
+        self.text = None
+        if result is not None:
+            self.starts, self.ends = result
+            self.search_finished.emit(self.generation)
+
+
+
 """ Dialog for Find and Replace functionality """
 class FindReplaceDialog(QDialog):
-    def __init__(self, text_edit):
-        super().__init__()
+    replacing_all = pyqtSignal(int, int)
+
+    incremental_limit = 1024 * 1024
+    highlight_limit = 2000
+
+    def __init__(self, text_edit, parent=None):
+        super().__init__(parent)
         self.text_edit = text_edit
         self.setWindowTitle("Find and Replace")
         self.setWindowIcon(load_icon('scratchpad.png'))
@@ -100,51 +1217,478 @@ class FindReplaceDialog(QDialog):
         self.replace_input = QLineEdit(self)
         self.layout.addWidget(self.replace_label)
         self.layout.addWidget(self.replace_input)
+        self.option_layout = QHBoxLayout()
+        self.regex_checkbox = QCheckBox("Regular expression", self)
+        self.case_checkbox = QCheckBox("Match case", self)
+        self.word_checkbox = QCheckBox("Whole words", self)
+        self.option_layout.addWidget(self.regex_checkbox)
+        self.option_layout.addWidget(self.case_checkbox)
+        self.option_layout.addWidget(self.word_checkbox)
+        self.layout.addLayout(self.option_layout)
+        self.match_label = QLabel("", self)
+        self.layout.addWidget(self.match_label)
         self.button_layout = QHBoxLayout()
+        self.find_previous_button = QPushButton("Find Previous", self)
         self.find_button = QPushButton("Find Next", self)
         self.replace_button = QPushButton("Replace", self)
         self.replace_all_button = QPushButton("Replace All", self)
+        self.button_layout.addWidget(self.find_previous_button)
         self.button_layout.addWidget(self.find_button)
         self.button_layout.addWidget(self.replace_button)
         self.button_layout.addWidget(self.replace_all_button)
         self.layout.addLayout(self.button_layout)
+        self.find_previous_button.clicked.connect(self.find_previous)
         self.find_button.clicked.connect(self.find_next)
         self.replace_button.clicked.connect(self.replace)
         self.replace_all_button.clicked.connect(self.replace_all)
         self.setLayout(self.layout)
-        self.current_index = 0
+        self.current_index = -1
+        self.pattern = None
+        self.starts = array('q')
+        self.ends = array('q')
+        self.generation = 0
+        self.search_thread = None
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(200)
+        self.search_timer.timeout.connect(self.start_search)
+        self.find_input.textChanged.connect(self.search_timer.start)
+        for checkbox in (self.regex_checkbox, self.case_checkbox, self.word_checkbox):
+            checkbox.toggled.connect(self.search_timer.start)
+        self.document = self.text_edit.document()
+        self.document.contentsChange.connect(self.on_contents_change)
+        self.text_edit.verticalScrollBar().valueChanged.connect(self.update_highlights)
 
-    def find_next(self):
-        text_to_find = self.find_input.text().strip()
-        if text_to_find:
-            options = QTextDocument.FindFlags()
-            found = self.text_edit.find(text_to_find, options)
-            if not found:
-                QMessageBox.information(self, "Not Found", "No more occurrences found.")
+    def document_changed(self):
+        self.document.contentsChange.disconnect(self.on_contents_change)
+        self.document = self.text_edit.document()
+        self.document.contentsChange.connect(self.on_contents_change)
+        if self.isVisible():
+            self.start_search()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.start_search()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.stop_search()
+        self.pattern = None
+        self.text_edit.setExtraSelections([])
+
+    def stop_search(self):
+        if self.search_thread is not None and self.search_thread.isRunning():
+            self.search_thread.requestInterruption()
+            self.search_thread.wait()
+        self.search_thread = None
+
+    def start_search(self):
+        self.stop_search()
+        self.generation += 1
+        self.starts = array('q')
+        self.ends = array('q')
+        self.current_index = -1
+        text = self.find_input.text()
+        if not text:
+            self.pattern = None
+            self.update_match_label()
+            self.update_highlights()
+            return
+        try:
+            self.pattern = compile_search_pattern(text, self.regex_checkbox.isChecked(),
+                                                  self.case_checkbox.isChecked(),
+                                                  self.word_checkbox.isChecked())
+        except re.error as e:
+            self.pattern = None
+            self.match_label.setText(f"Invalid pattern: {e}")
+            self.update_highlights()
+            return
+        self.match_label.setText("Searching...")
+        self.search_thread = SearchEngine(self.text_edit.toPlainText(), self.pattern, self.generation)
+        self.search_thread.search_finished.connect(self.on_search_finished)
+        self.search_thread.start()
+
+    def on_search_finished(self, generation):
+        if self.search_thread is None or generation != self.generation:
+            return
+        self.starts = self.search_thread.starts
+        self.ends = self.search_thread.ends
+        self.search_thread = None
+        self.update_match_label()
+        self.update_highlights()
+
+    def ensure_index(self):
+        if self.search_timer.isActive() or self.pattern is None:
+            self.search_timer.stop()
+            self.start_search()
+        if self.search_thread is not None:
+            self.search_thread.wait()
+            self.on_search_finished(self.search_thread.generation)
+        return self.pattern is not None
+
+    def on_contents_change(self, position, removed, added):
+        if self.pattern is None:
+            return
+        if (self.search_thread is not None or removed + added > self.incremental_limit
+                or spans_lines(self.pattern)):
+            self.search_timer.start()
+            return
+        document = self.text_edit.document()
+        delta = added - removed
+        first = document.findBlock(position)
+        last = document.findBlock(position + added)
+        low = first.position()
+        high = min(last.position() + last.length(), document.characterCount() - 1)
+        old_high = high - delta
+        starts, ends = self.starts, self.ends
+        i = bisect.bisect_right(ends, low)
+        if i < len(starts) and starts[i] < low:
+            low = starts[i]
+        j = max(i, bisect.bisect_left(starts, old_high))
+        if j > i and ends[j - 1] > old_high:
+            old_high = ends[j - 1]
+            high = old_high + delta
+        cursor = QTextCursor(document)
+        cursor.setPosition(low)
+        cursor.setPosition(high, QTextCursor.MoveMode.KeepAnchor)
+        segment = cursor.selectedText().replace('\u2029', '\n')
+        new_starts, new_ends = scan_matches(self.pattern, segment, low)
+        self.starts = starts[:i] + new_starts + array('q', (s + delta for s in starts[j:]))
+        self.ends = ends[:i] + new_ends + array('q', (e + delta for e in ends[j:]))
+        self.current_index = -1
+        self.update_match_label()
+        self.update_highlights()
+
+    def update_match_label(self):
+        if self.pattern is None:
+            self.match_label.setText("")
+        elif not self.starts:
+            self.match_label.setText("No matches")
+        elif self.current_index < 0:
+            self.match_label.setText(f"{len(self.starts)} matches")
         else:
+            self.match_label.setText(f"{self.current_index + 1} of {len(self.starts)}")
+
+    def update_highlights(self):
+        if self.pattern is None or not self.starts or not self.isVisible():
+            self.text_edit.setExtraSelections([])
+            return
+        viewport = self.text_edit.viewport()
+        top = self.text_edit.cursorForPosition(QPoint(0, 0)).position()
+        bottom = self.text_edit.cursorForPosition(QPoint(viewport.width(), viewport.height())).position()
+        first = bisect.bisect_right(self.ends, top)
+        last = min(bisect.bisect_left(self.starts, bottom + 1), first + self.highlight_limit)
+        document = self.text_edit.document()
+        selections = []
+        for index in range(first, last):
+            selection = QTextEdit.ExtraSelection()
+            selection.cursor = QTextCursor(document)
+            selection.cursor.setPosition(self.starts[index])
+            selection.cursor.setPosition(self.ends[index], QTextCursor.MoveMode.KeepAnchor)
+            selection.format.setBackground(QColor('#ff9632') if index == self.current_index else QColor('#ffff00'))
+            selections.append(selection)
+        self.text_edit.setExtraSelections(selections)
+
+    def select_match(self, index):
+        self.current_index = index
+        cursor = self.text_edit.textCursor()
+        cursor.setPosition(self.starts[index])
+        cursor.setPosition(self.ends[index], QTextCursor.MoveMode.KeepAnchor)
+        self.text_edit.setTextCursor(cursor)
+        self.update_match_label()
+        self.update_highlights()
+
+    @timed('find next')
+    def find_next(self):
+        if not self.find_input.text():
+            QMessageBox.warning(self, "Empty Search", "Please enter text to find.")
+            return
+        if not self.ensure_index():
+            return
+        if not self.starts:
+            QMessageBox.information(self, "Not Found", "No more occurrences found.")
+            return
+        cursor = self.text_edit.textCursor()
+        position = cursor.selectionStart() + 1 if cursor.hasSelection() else cursor.position()
+        index = bisect.bisect_left(self.starts, position)
+        self.select_match(index if index < len(self.starts) else 0)
+
+    @timed('find previous')
+    def find_previous(self):
+        if not self.find_input.text():
             QMessageBox.warning(self, "Empty Search", "Please enter text to find.")
+            return
+        if not self.ensure_index():
+            return
+        if not self.starts:
+            QMessageBox.information(self, "Not Found", "No more occurrences found.")
+            return
+        index = bisect.bisect_left(self.starts, self.text_edit.textCursor().selectionStart()) - 1
+        self.select_match(index if index >= 0 else len(self.starts) - 1)
+
+    def expand_match(self, index, replacement):
+        if not self.regex_checkbox.isChecked() or '\\' not in replacement:
+            return replacement
+        document = self.text_edit.document()
+        first = document.findBlock(self.starts[index])
+        last = document.findBlock(self.ends[index])
+        cursor = QTextCursor(document)
+        cursor.setPosition(first.position())
+        cursor.setPosition(self.starts[index], QTextCursor.MoveMode.KeepAnchor)
+        offset = len(cursor.selectedText())
+        cursor.setPosition(last.position() + last.length() - 1, QTextCursor.MoveMode.KeepAnchor)
+        segment = cursor.selectedText().replace('\u2029', '\n')
+        match = self.pattern.match(segment, offset)
+        return match.expand(replacement) if match else replacement
 
+    @timed('replace')
     def replace(self):
-        text_to_find = self.find_input.text()
-        text_to_replace = self.replace_input.text()
-        if text_to_find and text_to_replace:
-            content = self.text_edit.toPlainText()
-            self.text_edit.setPlainText(content.replace(text_to_find, text_to_replace, 1))
+        if not self.find_input.text():
+            QMessageBox.warning(self, "Empty Search", "Please enter text to find.")
+            return
+        if not self.ensure_index():
+            return
+        cursor = self.text_edit.textCursor()
+        index = bisect.bisect_left(self.starts, cursor.selectionStart())
+        if (not cursor.hasSelection() or index >= len(self.starts) or self.starts[index] != cursor.selectionStart()
+                or self.ends[index] != cursor.selectionEnd()):
+            self.find_next()
+            return
+        try:
+            replacement = self.expand_match(index, self.replace_input.text())
+        except (re.error, IndexError) as e:
+            QMessageBox.warning(self, "Invalid Replacement", f"Invalid replacement: {e}")
+            return
+        cursor.beginEditBlock()
+        cursor.insertText(replacement)
+        cursor.endEditBlock()
+        self.text_edit.setTextCursor(cursor)
+        if self.starts:
+            self.find_next()
 
+    @timed('replace all')
     def replace_all(self):
-        text_to_find = self.find_input.text()
-        text_to_replace = self.replace_input.text()
-        if text_to_find and text_to_replace:
-            content = self.text_edit.toPlainText()
-            self.text_edit.setPlainText(content.replace(text_to_find, text_to_replace))
+        if not self.find_input.text():
+            QMessageBox.warning(self, "Empty Search", "Please enter text to find.")
+            return
+        if not self.ensure_index():
+            return
+        replacement = self.replace_input.text()
+        if self.regex_checkbox.isChecked() and '\\' in replacement:
+            text = self.text_edit.toPlainText()
+            astral = astral_offsets(text)
+            try:
+                edits = [(document_position(astral, match.start()), document_position(astral, match.end()),
+                          match.expand(replacement))
+                         for match in self.pattern.finditer(text) if match.end() > match.start()]
+            except (re.error, IndexError) as e:
+                QMessageBox.warning(self, "Invalid Replacement", f"Invalid replacement: {e}")
+                return
+            del text, astral
+        else:
+            edits = [(start, end, replacement) for start, end in zip(self.starts, self.ends)]
+        if not edits:
+            self.match_label.setText("Replaced 0 matches")
+            return
+        # Each edit is a removal and an insertion on the undo stack, plus one command for the edit block
+        self.replacing_all.emit(2 * len(edits) + 1, sum(end - start for start, end, text in edits))
+        cursor = QTextCursor(self.text_edit.document())
+        set_position, insert_text = cursor.setPosition, cursor.insertText
+        keep_anchor = QTextCursor.MoveMode.KeepAnchor
+        cursor.beginEditBlock()
+        for start, end, text in reversed(edits):
+            set_position(start)
+            set_position(end, keep_anchor)
+            insert_text(text)
+        cursor.endEditBlock()
+        self.match_label.setText(f"Replaced {len(edits)} matches")
+
+
+
+""" Utility function to get the HTTP session shared by every web import """
+_http_session = None
+_http_session_lock = threading.Lock()
+
+def http_session():
+    global _http_session
+    import requests
+    with _http_session_lock:
+        if _http_session is None:
+            _http_session = requests.Session()
+            _http_session.headers['User-Agent'] = 'Scratchpad'
+        return _http_session
+
+
+
+""" On-disk cache of web imports revalidated with ETag/Last-Modified """
+class WebCache:
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir
+
+    def paths(self, url):
+        if self.cache_dir is None:
+            cache_root = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.GenericCacheLocation)
+            self.cache_dir = os.path.join(cache_root, 'Scratchpad', 'web')
+        name = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{name}.json"), os.path.join(self.cache_dir, f"{name}.body")
+
+    def lookup(self, url):
+        meta_path, body_path = self.paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as meta_file:
+                meta = json.load(meta_file)
+        except (OSError, ValueError):
+            return None
+        if meta.get('url') != url or not os.path.exists(body_path):
+            return None
+        return meta
+
+    def conditionalHeaders(self, meta):
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def bodyPath(self, url):
+        return self.paths(url)[1]
+
+    def begin(self, url):
+        meta_path, body_path = self.paths(url)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=self.cache_dir)
+        return os.fdopen(fd, 'wb'), temp_path
+
+    def commit(self, url, temp_path, meta):
+        meta_path, body_path = self.paths(url)
+        os.replace(temp_path, body_path)
+        with open(f"{meta_path}.tmp", 'w', encoding='utf-8') as meta_file:
+            json.dump(dict(meta, url=url), meta_file)
+        os.replace(f"{meta_path}.tmp", meta_path)
+
+
+web_cache = WebCache()
+
+
+
+""" Thread for streaming content from the web into the document """
+class WebFetcher(QThread):
+    fetch_started = pyqtSignal(str, int)
+    content_fetched = pyqtSignal(str, str)
+    fetch_progress = pyqtSignal(int, int)
+    fetch_finished = pyqtSignal(bool)
+    fetch_failed = pyqtSignal(str)
+
+    # A streamed read blocks until it has a whole chunk, so small chunks keep a slow server responsive
+    chunk_size = 16 * 1024
+    chunk_window = 32
+    timeout = (10, 30)
+
+    def __init__(self, url, byte_limit, cache=None):
+        super().__init__()
+        self.url = url
+        self.byte_limit = byte_limit
+        self.cache = cache if cache is not None else web_cache
+        self.chunk_slots = threading.Semaphore(self.chunk_window)
+        self.response = None
+
+    def abort(self):
+        # response.close() waits for a read blocked on the network to time out; shutting the socket down
+        # breaks that read at once, so the thread ends promptly without the GUI waiting for it
+        self.requestInterruption()
+        response = self.response
+        if response is not None and hasattr(response.raw, 'shutdown'):
+            response.raw.shutdown()
+
+    @timed('web fetch')
+    def run(self):
+        cache_file = temp_path = None
+        try:
+            meta = self.cache.lookup(self.url)
+            headers = self.cache.conditionalHeaders(meta) if meta else {}
+            with http_session().get(self.url, headers=headers, stream=True, timeout=self.timeout) as response:
+                self.response = response
+                if self.isInterruptionRequested():
+                    self.fetch_finished.emit(False)
+                    return
+                if response.status_code == 304 and meta:
+                    with open(self.cache.bodyPath(self.url), 'rb') as body:
+                        self.stream(iter(lambda: body.read(self.chunk_size), b''),
+                                    meta.get('encoding'), os.path.getsize(self.cache.bodyPath(self.url)))
+                    return
+                response.raise_for_status()
+                total = int(response.headers.get('Content-Length') or 0)
+                if total > self.byte_limit:
+                    raise ValueError(f"Content exceeds the import limit of {self.byte_limit} bytes")
+                meta = {'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified')}
+                if meta['etag'] or meta['last_modified']:
+                    cache_file, temp_path = self.cache.begin(self.url)
+                encoding = None
+                if 'charset' in response.headers.get('Content-Type', '').lower():
+                    from requests.utils import get_encoding_from_headers
+                    encoding = get_encoding_from_headers(response.headers)
+                encoding = self.stream(response.iter_content(self.chunk_size), encoding, total, cache_file)
+                if cache_file is not None:
+                    cache_file.close()
+                    cache_file = None
+                    if encoding is not None:
+                        meta['encoding'] = encoding
+                        self.cache.commit(self.url, temp_path, meta)
+                        temp_path = None
+        except Exception as e:
+            self.fetch_failed.emit(f"Failed to fetch content: {e}")
+        finally:
+            if cache_file is not None:
+                cache_file.close()
+            if temp_path is not None and os.path.exists(temp_path):
+                os.unlink(temp_path)
+
+    def stream(self, chunks, encoding, total, cache_file=None):
+        decoder = None
+        fetched = 0
+        for chunk in chunks:
+            if self.isInterruptionRequested():
+                self.fetch_finished.emit(False)
+                return None
+            if not chunk:
+                continue
+            fetched += len(chunk)
+            if fetched > self.byte_limit:
+                raise ValueError(f"Content exceeds the import limit of {self.byte_limit} bytes")
+            if cache_file is not None:
+                cache_file.write(chunk)
+            if decoder is None:
+                encoding = encoding or sniff_encoding(chunk[:ENCODING_SAMPLE_SIZE])
+                decoder = io.IncrementalNewlineDecoder(
+                    codecs.getincrementaldecoder(encoding)(errors='replace'), translate=True)
+                self.fetch_started.emit(encoding, total)
+            text = decoder.decode(chunk)
+            if text:
+                if not acquire_chunk_slot(self.chunk_slots, self.isInterruptionRequested):
+                    self.fetch_finished.emit(False)
+                    return None
+                self.content_fetched.emit(text, encoding)
+            self.fetch_progress.emit(fetched, total)
+        if decoder is None:
+            encoding = encoding or 'utf-8'
+            self.fetch_started.emit(encoding, total)
+        else:
+            text = decoder.decode(b'', final=True)
+            if text:
+                if not acquire_chunk_slot(self.chunk_slots, self.isInterruptionRequested):
+                    self.fetch_finished.emit(False)
+                    return None
+                self.content_fetched.emit(text, encoding)
+        self.fetch_finished.emit(True)
+        return encoding
 
 
 
 """ Dialog for importing content from the web """
 class ImportFromWebDialog(QDialog):
-    def __init__(self, text_edit):
-        super().__init__()
-        self.text_edit = text_edit
+    def __init__(self, parent=None):
+        super().__init__(parent)
         self.setWindowTitle("Import From Web")
         self.setWindowIcon(load_icon('scratchpad.png'))
         self.layout = QVBoxLayout(self)
@@ -157,24 +1701,482 @@ class ImportFromWebDialog(QDialog):
         self.fetch_button.clicked.connect(self.fetch_from_web)
         self.setLayout(self.layout)
 
+    def url(self):
+        return self.url_input.text().strip()
+
     def fetch_from_web(self):
-        url = self.url_input.text().strip()
-        if self.is_valid_url(url):
-            try:
-                response = requests.get(url)
-                response.raise_for_status()
-                self.text_edit.setPlainText(response.text)
-                self.accept()
-            except requests.exceptions.RequestException as e:
-                QMessageBox.critical(self, "Error", f"Failed to fetch content: {e}")
+        if self.is_valid_url(self.url()):
+            self.accept()
         else:
             QMessageBox.warning(self, "Invalid URL", "Please enter a valid HTTPS URL.")
 
     def is_valid_url(self, url):
+        import validators
         return validators.url(url) and url.startswith("https://")
 
 
 
+""" Thread that performs all recovery-journal disk I/O in order """
+class JournalWriter(QThread):
+    def __init__(self):
+        super().__init__()
+        self.queue = queue.Queue()
+
+    def run(self):
+        while (item := self.queue.get()) is not None:
+            operation, args = item
+            try:
+                getattr(self, operation)(*args)
+            except OSError as e:
+                print(f"Recovery journal error: {e}")
+
+    def append(self, journal_path, lines):
+        with open(journal_path, 'a', encoding='utf-8', newline='\n') as journal_file:
+            journal_file.write(''.join(lines))
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+
+    def writeMeta(self, meta_path, meta):
+        with open(f"{meta_path}.tmp", 'w', encoding='utf-8') as meta_file:
+            json.dump(meta, meta_file)
+        os.replace(f"{meta_path}.tmp", meta_path)
+
+    def snapshot(self, snapshot_path, journal_path, sequence, text):
+        with open(f"{snapshot_path}.tmp", 'w', encoding='utf-8', newline='\n') as snapshot_file:
+            snapshot_file.write(json.dumps({'s': sequence}) + '\n')
+            snapshot_file.write(text)
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+        os.replace(f"{snapshot_path}.tmp", snapshot_path)
+        open(journal_path, 'w').close()
+
+    def spillText(self, path, text, written):
+        import gzip
+        try:
+            with gzip.open(path, 'wt', encoding='utf-8', newline='', compresslevel=1) as spill_file:
+                spill_file.write(text)
+        finally:
+            written.set()
+
+    def remove(self, paths):
+        for path in paths:
+            if os.path.exists(path):
+                os.unlink(path)
+
+    def stop(self):
+        self.queue.put(None)
+        self.wait()
+
+
+_journal_writer = None
+
+def journal_writer():
+    global _journal_writer
+    if _journal_writer is None:
+        _journal_writer = JournalWriter()
+        _journal_writer.start()
+        QApplication.instance().aboutToQuit.connect(_journal_writer.stop)
+    return _journal_writer
+
+
+def recovery_directory():
+    data_dir = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.GenericDataLocation)
+    return os.path.join(data_dir, 'Scratchpad', 'recovery')
+
+
+
+""" Append-only journal of document edits used to recover unsaved work after a crash """
+class RecoveryJournal:
+    batch_bytes = 1024 * 1024
+    compaction_bytes = 8 * 1024 * 1024
+
+    def __init__(self, directory=None):
+        self.directory = directory or recovery_directory()
+        self.id = uuid.uuid4().hex
+        path = os.path.join(self.directory, self.id)
+        self.meta_path = f"{path}.json"
+        self.journal_path = f"{path}.journal"
+        self.snapshot_path = f"{path}.snapshot"
+        self.lock = QLockFile(f"{path}.lock")
+        self.base = None
+        self.started = False
+        self.sequence = 0
+        self.pending = []
+        self.pending_bytes = 0
+        self.journal_bytes = 0
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.lock.tryLock(0)
+        meta = dict(self.base or {}, id=self.id, created=time.time())
+        journal_writer().queue.put(('writeMeta', (self.meta_path, meta)))
+        self.started = True
+
+    def reset(self, base=None):
+        self.pending = []
+        self.pending_bytes = 0
+        self.journal_bytes = 0
+        if self.started:
+            journal_writer().queue.put(('remove', ((self.journal_path, self.snapshot_path, self.meta_path),)))
+            self.lock.unlock()
+            self.started = False
+        self.base = base
+
+    def record(self, position, removed, text, length):
+        if not self.started:
+            self.start()
+        self.sequence += 1
+        line = json.dumps({'s': self.sequence, 'p': position, 'r': removed, 't': text, 'n': length}) + '\n'
+        self.pending.append(line)
+        self.pending_bytes += len(line)
+        if self.pending_bytes >= self.batch_bytes:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            journal_writer().queue.put(('append', (self.journal_path, self.pending)))
+            self.journal_bytes += self.pending_bytes
+            self.pending = []
+            self.pending_bytes = 0
+
+    def needsCompaction(self, document_length):
+        return self.journal_bytes + self.pending_bytes > max(self.compaction_bytes, document_length)
+
+    def snapshot(self, text):
+        if not self.started:
+            self.start()
+        self.pending = []
+        self.pending_bytes = 0
+        self.journal_bytes = 0
+        journal_writer().queue.put(('snapshot', (self.snapshot_path, self.journal_path, self.sequence, text)))
+
+    def discard(self):
+        self.reset(None)
+
+
+
+""" Utility function to list journals left behind by sessions that did not close cleanly """
+def find_recoverable_journals(directory=None):
+    directory = directory or recovery_directory()
+    journals = []
+    if not os.path.isdir(directory):
+        return journals
+    for name in os.listdir(directory):
+        if not name.endswith('.json'):
+            continue
+        path = os.path.join(directory, name[:-5])
+        lock = QLockFile(f"{path}.lock")
+        if not lock.tryLock(0):
+            continue
+        lock.unlock()
+        try:
+            with open(f"{path}.json", 'r', encoding='utf-8') as meta_file:
+                meta = json.load(meta_file)
+        except (OSError, ValueError):
+            continue
+        meta['paths'] = [f"{path}.json", f"{path}.journal", f"{path}.snapshot", f"{path}.lock"]
+        journals.append(meta)
+    return sorted(journals, key=lambda meta: meta.get('created', 0))
+
+
+""" Utility function to rebuild the text of a document from its base, snapshot and journal """
+def replay_journal(meta):
+    meta_path, journal_path, snapshot_path, lock_path = meta['paths']
+    sequence = 0
+    if os.path.exists(snapshot_path):
+        with open(snapshot_path, 'r', encoding='utf-8', newline='') as snapshot_file:
+            sequence = json.loads(snapshot_file.readline())['s']
+            text = snapshot_file.read()
+    elif meta.get('file_path'):
+        file_stat = os.stat(meta['file_path'])
+        if file_stat.st_size != meta['size'] or file_stat.st_mtime_ns != meta['mtime_ns']:
+            raise ValueError(f"{meta['file_path']} has changed on disk since the journal was written")
+        with open(meta['file_path'], 'rb') as raw, compression_stream(raw, meta.get('compression')) as file:
+            text = io.TextIOWrapper(file, encoding=meta['encoding'], errors='replace').read()
+    else:
+        text = ''
+    complete = True
+    if os.path.exists(journal_path):
+        # Journal positions and lengths are QTextDocument positions, which count UTF-16 units
+        units = bytearray(text.encode('utf-16-le', 'surrogatepass'))
+        with open(journal_path, 'r', encoding='utf-8', newline='\n') as journal_file:
+            for line in journal_file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                if entry['s'] <= sequence:
+                    continue
+                position = 2 * entry['p']
+                units[position:position + 2 * entry['r']] = entry['t'].encode('utf-16-le', 'surrogatepass')
+                if len(units) != 2 * entry['n']:
+                    complete = False
+                    break
+        text = units.decode('utf-16-le', 'surrogatepass')
+    return text, complete
+
+
+
+""" Approximate accounting of the memory held by a document's undo stack, kept within a budget
+
+QTextDocument can only clear its undo stack as a whole, so going over the budget drops every step
+but the newest. With spilling on, the text each run of steps started from is compressed to a temp
+file, and Undo restores it once the steps still in memory run out.
+"""
+class UndoHistory:
+    # A QTextUndoCommand is 32 bytes; the rest allows for the spare capacity of the list holding them
+    command_overhead = 48
+    coalesce_interval = 1.0
+    reapply_limit = 1024
+    spill_limit = 16
+
+    def __init__(self, document, budget, spill=False):
+        self.document = document
+        self.budget = budget
+        self.spill = spill
+        self.steps = deque()
+        self.total = 0
+        self.top = 0
+        self.recording = None
+        self.typing = None
+        self.dropped = 0
+        self.base = None
+        self.checkpoints = []
+        self.expected_removed = None
+        # Parented to the document, so a step still open when the document is deleted is never finished
+        self.step_timer = QTimer(document)
+        self.step_timer.setSingleShot(True)
+        self.step_timer.setInterval(0)
+        self.step_timer.timeout.connect(self.finishStep)
+        document.undoCommandAdded.connect(self.commandAdded)
+        document.contentsChange.connect(self.contentsChanged)
+
+    def reset(self):
+        self.steps.clear()
+        self.total = 0
+        self.top = self.document.availableUndoSteps()
+        self.recording = None
+        self.typing = None
+        self.step_timer.stop()
+
+    def discard(self):
+        self.reset()
+        paths = [path for path, written in self.checkpoints + ([self.base] if self.base else [])]
+        if paths:
+            journal_writer().queue.put(('remove', (paths,)))
+        self.base = None
+        self.checkpoints = []
+
+    def rebase(self):
+        # Called whenever the document gets new content that the steps to come will start from
+        self.discard()
+        if self.spill:
+            self.base = self.spillText(self.document.toPlainText())
+
+    def commandAdded(self):
+        index = self.document.availableUndoSteps()
+        # A new command throws away whatever could have been redone
+        while self.steps and self.steps[-1][0] > index:
+            self.total -= self.steps.pop()[1]
+        if self.steps and self.steps[-1][0] == index:
+            step = self.steps[-1]
+        else:
+            commands = max(1, index - (self.steps[-1][0] if self.steps else 0))
+            step = [index, self.estimate(commands, 0), [], commands]
+            self.steps.append(step)
+            self.total += step[1]
+        self.top = index
+        if self.recording is None:
+            self.step_timer.start()
+        self.recording = step
+
+    def estimate(self, commands, removed):
+        # Inserted text is part of the document; undo additionally holds what was removed
+        return self.command_overhead * commands + 2 * removed
+
+    def contentsChanged(self, position, removed, added):
+        # Only the changes that created a command are counted, not keystrokes Qt later merges into it.
+        # An edit block reports one span from its first edit to its last, so an edit announced through
+        # makeRoom is charged for the text it actually removes instead
+        expected_removed, self.expected_removed = self.expected_removed, None
+        step = self.recording
+        if step is None:
+            return
+        cost = 2 * (removed if expected_removed is None else expected_removed)
+        step[1] += cost
+        step[2].append((position, removed, added))
+        self.total += cost
+
+    def finishStep(self):
+        self.recording = None
+        self.expected_removed = None
+        if self.total > self.budget and self.document.availableUndoSteps() == self.top:
+            newest = self.steps[-1]
+            # Keeping the newest step means undoing and redoing it, which is only cheap for small steps
+            self.drop(keep_newest=len(self.steps) > 1 and len(newest[2]) == 1 and newest[1] <= self.budget
+                      and newest[3] <= self.reapply_limit)
+
+    def makeRoom(self, commands, removed):
+        # Called before a large edit so that it, rather than the steps before it, stays undoable
+        if self.steps and self.total + self.estimate(commands, removed) > self.budget:
+            self.drop()
+        self.expected_removed = removed
+
+    def drop(self, keep_newest=False):
+        document = self.document
+        newest = self.steps[-1] if keep_newest else None
+        modified = document.isModified()
+        # Undoing and redoing the newest step changes nothing in the end, so no one else needs to hear about it
+        document.blockSignals(True)
+        try:
+            if newest is not None:
+                position, removed, added = newest[2][0]
+                cursor = QTextCursor(document)
+                cursor.setPosition(position)
+                cursor.setPosition(position + added, QTextCursor.MoveMode.KeepAnchor)
+                inserted = cursor.selectedText().replace('\u2029', '\n')
+                document.undo()
+            document.clearUndoRedoStacks()
+            if self.spill:
+                if self.base is not None:
+                    self.checkpoints.append(self.base)
+                    if len(self.checkpoints) > self.spill_limit:
+                        journal_writer().queue.put(('remove', ([self.checkpoints.pop(0)[0]],)))
+                self.base = self.spillText(document.toPlainText())
+            if newest is not None:
+                cursor.setPosition(position)
+                cursor.setPosition(position + removed, QTextCursor.MoveMode.KeepAnchor)
+                cursor.insertText(inserted)
+        finally:
+            document.blockSignals(False)
+        self.dropped += len(self.steps) - (newest is not None)
+        self.reset()
+        if newest is not None:
+            newest[0] = self.top
+            self.steps.append(newest)
+            self.total = newest[1]
+        document.setModified(modified)
+
+    def spillText(self, text):
+        fd, path = tempfile.mkstemp(prefix='scratchpad-undo-', suffix='.gz')
+        os.close(fd)
+        written = threading.Event()
+        journal_writer().queue.put(('spillText', (path, text, written)))
+        return path, written
+
+    def restoreCheckpoint(self):
+        import gzip
+        path, written = self.checkpoints[-1]
+        written.wait()
+        with gzip.open(path, 'rt', encoding='utf-8', newline='') as file:
+            text = file.read()
+        self.checkpoints.pop()
+        if self.base is not None:
+            journal_writer().queue.put(('remove', ([self.base[0]],)))
+        # The restored text is where the steps to come start from, so its file becomes the new base
+        self.base = (path, written)
+        document = self.document
+        document.setUndoRedoEnabled(False)
+        with instrumentation.span('setPlainText'):
+            document.setPlainText(text)
+        document.setUndoRedoEnabled(True)
+        document.setModified(True)
+        self.reset()
+
+    def typed(self, editor, event):
+        # Qt already merges plain keystrokes; joining edit blocks also folds Enter into the run
+        text = event.text()
+        modifiers = event.modifiers() & ~(Qt.KeyboardModifier.ShiftModifier | Qt.KeyboardModifier.KeypadModifier)
+        if (not text or modifiers or editor.isReadOnly() or editor.overwriteMode()
+                or not (text.isprintable() or text in '\t\r') or (text == '\r' and event.modifiers())):
+            self.typing = None
+            return False
+        cursor = editor.textCursor()
+        now = time.monotonic()
+        if (self.typing is not None and not cursor.hasSelection() and cursor.position() == self.typing[0]
+                and now - self.typing[1] <= self.coalesce_interval and self.document.availableUndoSteps() == self.top):
+            cursor.joinPreviousEditBlock()
+        else:
+            cursor.beginEditBlock()
+        if text == '\r':
+            cursor.insertBlock()
+        else:
+            cursor.insertText(text)
+        cursor.endEditBlock()
+        editor.setTextCursor(cursor)
+        editor.ensureCursorVisible()
+        self.typing = (cursor.position(), now)
+        return True
+
+
+""" Utility function to name the local socket shared by every launch of the same user """
+def instance_server_name():
+    home = os.path.expanduser('~').encode('utf-8', 'surrogateescape')
+    return f"scratchpad-{hashlib.sha1(home).hexdigest()[:12]}"
+
+
+""" Utility function to hand file arguments to a running editor; False means start normally """
+def send_to_running_instance(arguments, timeout=500):
+    socket = QLocalSocket()
+    socket.connectToServer(instance_server_name())
+    if not socket.waitForConnected(timeout):
+        return False
+    request = json.dumps({'cwd': os.getcwd(), 'arguments': arguments}) + '\n'
+    socket.write(request.encode('utf-8'))
+    socket.flush()
+    # A server that accepts but never answers belongs to a hung editor; start a fresh one instead
+    acknowledged = socket.waitForReadyRead(timeout * 4) and bytes(socket.readLine()).strip() == b'ok'
+    socket.abort()
+    return acknowledged
+
+
+""" Local server through which later launches hand their files to the running editor """
+class InstanceServer(QObject):
+    files_requested = pyqtSignal(list)
+    probe_timeout = 200
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self.server.newConnection.connect(self.acceptConnections)
+
+    def listen(self):
+        name = instance_server_name()
+        if self.server.listen(name):
+            return True
+        probe = QLocalSocket()
+        probe.connectToServer(name)
+        if probe.waitForConnected(self.probe_timeout):
+            probe.abort()
+            return False
+        # Nobody answers: the socket was left behind by an editor that crashed
+        QLocalServer.removeServer(name)
+        return self.server.listen(name)
+
+    def close(self):
+        self.server.close()
+
+    def acceptConnections(self):
+        while self.server.hasPendingConnections():
+            connection = self.server.nextPendingConnection()
+            connection.readyRead.connect(functools.partial(self.readRequest, connection))
+            connection.disconnected.connect(connection.deleteLater)
+
+    def readRequest(self, connection):
+        if not connection.canReadLine():
+            return
+        try:
+            request = json.loads(bytes(connection.readLine()).decode('utf-8'))
+            paths = [os.path.join(request['cwd'], argument) for argument in request['arguments']]
+        except (ValueError, KeyError, TypeError):
+            connection.abort()
+            return
+        connection.write(b'ok\n')
+        connection.disconnectFromServer()
+        self.files_requested.emit(paths)
+
+
 """ Dialog for unsaved changes warning """
 class UnsavedWorkDialog(QDialog):
     def __init__(self, parent=None):
@@ -202,60 +2204,178 @@ class UnsavedWorkDialog(QDialog):
 
 
 
+""" State of one open document; the main window shows one tab at a time """
+class DocumentTab:
+    def __init__(self):
+        self.document = None
+        self.current_file = None
+        self.encoding = "UTF-8"
+        self.compression = None
+        self.lossy = False
+        self.unsaved_changes = False
+        self.journal = RecoveryJournal()
+        self.undo_history = None
+        self.large_file_mode = False
+        self.large_view = None
+        self.large_find_text = ""
+        self.loader = None
+        self.web_fetcher = None
+        self.load_cursor = None
+        self.load_progress = None
+        self.pending_text = deque()
+        self.after_insert = None
+        self.reloading = False
+        self.follower = None
+        self.follow_state = None
+        self.follow_decoder = None
+        self.follow_after_load = False
+        self.word_count = 0
+        self.stats_stale = False
+        self.cursor_position = 0
+        self.scroll_value = 0
+        self.spill_path = None
+        self.last_used = time.monotonic()
+
+    def title(self):
+        return os.path.basename(self.current_file) if self.current_file else 'Unnamed'
+
+    def isLoading(self):
+        return (self.loader is not None or self.load_cursor is not None
+                or (self.web_fetcher is not None and self.web_fetcher.isRunning()))
+
+    def isModified(self):
+        return self.spill_path is not None or (self.document is not None and self.document.isModified())
+
+    def isPristine(self):
+        return (self.current_file is None and not self.large_file_mode and not self.isLoading()
+                and self.document is not None and self.document.isEmpty() and not self.document.isModified())
+
+    def memoryUsage(self):
+        # QTextDocument keeps the text as UTF-16, so this is a lower bound of what releasing the tab frees
+        if self.document is None or self.large_file_mode:
+            return 0
+        return self.document.characterCount() * 2 + (self.undo_history.total if self.undo_history else 0)
+
+
+
 """ Main window """
 class Scratchpad(QMainWindow):
-    def __init__(self, file_to_open=None):
+    def __init__(self, files_to_open=(), startup_profile=None):
         super().__init__()
-        self.current_file = file_to_open
-        self.file_handler = None
-        self.unsaved_changes = False
+        self.startup_profile = startup_profile
+        self.save_handler = None
+        self.save_tab = None
+        self.save_revision = 0
         self.loadRecentFiles()
         self.initUI()
-        if file_to_open:
-            self.load_file_on_startup(file_to_open)
+        if files_to_open:
+            QTimer.singleShot(0, lambda: self.load_files_on_startup(files_to_open))
 
-    def load_file_on_startup(self, file_path):
-        if os.path.exists(file_path):
-            self.current_file = file_path
-            self.file_handler = FileHandler(file_path)
-            self.file_handler.file_content_loaded.connect(self.loadFileContent)
-            self.file_handler.start()
-        else:
-            QMessageBox.critical(self, "Error", f"File does not exist: {file_path}")
+    def load_files_on_startup(self, file_paths):
+        for file_path in file_paths:
+            if os.path.exists(file_path):
+                self.openPath(file_path)
+            else:
+                self.reportStartup()
+                QMessageBox.critical(self, "Error", f"File does not exist: {file_path}")
+
+    def openRequestedFiles(self, file_paths):
+        if self.isMinimized():
+            self.showNormal()
+        self.raise_()
+        self.activateWindow()
+        for file_path in file_paths:
+            if os.path.exists(file_path):
+                self.openPath(file_path)
+            else:
+                QMessageBox.critical(self, "Error", f"File does not exist: {file_path}")
 
     def closeEvent(self, event):
-        if self.textEdit.document().isModified():
-            dialog = UnsavedWorkDialog(self)
-            result = dialog.exec_()
-            if result == QDialog.Accepted:
-                self.saveFile()
-                event.accept()
-            elif result == QDialog.Rejected:
+        for tab in self.tabs():
+            if not self.confirmCloseTab(tab):
                 event.ignore()
-            elif result == 2:
-                event.accept()
-        else:
-            event.accept()
+                return
+        for tab in self.tabs():
+            self.shutdownTab(tab)
+        event.accept()
 
     def initUI(self):
         self.setWindowTitle('Scratchpad - Unnamed')
         self.setGeometry(100, 100, 800, 600)
         self.setWindowIcon(load_icon('scratchpad.png'))
         self.textEdit = QTextEdit(self)
-        self.setCentralWidget(self.textEdit)
         self.textEdit.setAcceptRichText(False)
+        self.textEdit.installEventFilter(self)
+        self.findReplaceDialog = None
+        self.large_file_threshold = self.settings.value("largeFileThreshold", 256 * 1024 * 1024, type=int)
+        self.web_import_limit = self.settings.value("webImportLimit", 64 * 1024 * 1024, type=int)
+        self.tab_memory_budget = self.settings.value("inactiveTabMemoryBudget", 256 * 1024 * 1024, type=int)
+        self.undo_memory_budget = self.settings.value("undoMemoryBudget", 128 * 1024 * 1024, type=int)
+        self.spill_undo_history = self.settings.value("spillUndoHistory", False, type=bool)
+        self.loaderPool = QThreadPool(self)
+        self.loaderPool.setMaxThreadCount(max(1, self.settings.value("loaderThreads", 2, type=int)))
+        # Loaded text is inserted in small pieces under a per-tick time budget, so input and painting
+        # keep running between them
+        self.insert_piece_size = 16 * 1024
+        self.insert_budget = 0.02
+        self.insertTimer = QTimer(self)
+        self.insertTimer.setSingleShot(True)
+        self.insertTimer.setInterval(0)
+        self.insertTimer.timeout.connect(self.insertPendingText)
+        self.detached_fetchers = set()
+        self.tab = None
+        self.tabBar = QTabBar(self)
+        self.tabBar.setDocumentMode(True)
+        self.tabBar.setTabsClosable(True)
+        self.tabBar.setMovable(True)
+        self.tabBar.setExpanding(False)
+        self.tabBar.currentChanged.connect(self.onTabChanged)
+        self.tabBar.tabCloseRequested.connect(self.closeTabAt)
+        self.editorStack = QStackedWidget(self)
+        self.editorStack.addWidget(self.textEdit)
+        centralWidget = QWidget(self)
+        centralLayout = QVBoxLayout(centralWidget)
+        centralLayout.setContentsMargins(0, 0, 0, 0)
+        centralLayout.setSpacing(0)
+        centralLayout.addWidget(self.tabBar)
+        centralLayout.addWidget(self.editorStack)
+        self.setCentralWidget(centralWidget)
         self.statusBar = QStatusBar(self)
         self.setStatusBar(self.statusBar)
+        self.loadProgress = QProgressBar(self)
+        self.loadProgress.setMaximumWidth(200)
+        self.loadProgress.setTextVisible(False)
+        self.loadProgress.hide()
+        self.statusBar.addPermanentWidget(self.loadProgress)
+        self.cancelLoadButton = QPushButton("Cancel", self)
+        self.cancelLoadButton.clicked.connect(lambda: self.cancelStreamingLoad())
+        self.cancelLoadButton.hide()
+        self.statusBar.addPermanentWidget(self.cancelLoadButton)
         self.line = 1
         self.column = 1
         self.char_count = 0
-        self.encoding = "UTF-8"
+        self.stats_generation = 0
+        self.stats_block = (-1, 0, 0)
+        self.stats_incremental_limit = 64 * 1024
+        self.stats_counter = None
+        self.recountTimer = QTimer(self)
+        self.recountTimer.setSingleShot(True)
+        self.recountTimer.setInterval(500)
+        self.recountTimer.timeout.connect(self.recountStats)
+        self.journalTimer = QTimer(self)
+        self.journalTimer.setInterval(2000)
+        self.journalTimer.timeout.connect(self.flushJournal)
+        self.journalTimer.start()
+        self.follow_chunk_size = 4 * 1024 * 1024
+        self.performanceDialog = None
         self.textEdit.cursorPositionChanged.connect(self.updateStatusBar)
         self.createMenu()
         self.textEdit.textChanged.connect(self.on_text_changed)
+        self.newTab()
 
     def on_text_changed(self):
-        self.unsaved_changes = True
+        self.tab.unsaved_changes = True
+        self.updateStatusBar()
 
     def createMenu(self):
         menubar = self.menuBar()
@@ -263,6 +2383,8 @@ class Scratchpad(QMainWindow):
         self.createFileActions(fileMenu)
         editMenu = menubar.addMenu('&Edit')
         self.createEditActions(editMenu)
+        helpMenu = menubar.addMenu('&Help')
+        self.createHelpActions(helpMenu)
 
     def createFileActions(self, menu):
         self.actions = {}
@@ -291,6 +2413,17 @@ class Scratchpad(QMainWindow):
         importFromWebAction.triggered.connect(self.importFromWeb)
         menu.addAction(importFromWebAction)
         self.actions['importfromweb'] = importFromWebAction
+        followAction = QAction('Follow File', self)
+        followAction.setShortcut('Ctrl+T')
+        followAction.setCheckable(True)
+        followAction.triggered.connect(self.toggleFollow)
+        menu.addAction(followAction)
+        self.actions['follow'] = followAction
+        closeTabAction = QAction('Close Tab', self)
+        closeTabAction.setShortcut('Ctrl+W')
+        closeTabAction.triggered.connect(lambda: self.closeTabAt(self.tabBar.currentIndex()))
+        menu.addAction(closeTabAction)
+        self.actions['closetab'] = closeTabAction
 
         exitAction = QAction('Exit', self)
         exitAction.setShortcut('Ctrl+Q')
@@ -301,12 +2434,12 @@ class Scratchpad(QMainWindow):
         menu.addSeparator()
         self.recentFilesMenu = menu.addMenu('Recently Opened Files')
         self.recentFilesMenu.aboutToShow.connect(self.updateRecentFilesMenu)
-        self.updateRecentFilesMenu() #Removing this means you need to hover over it before it grays out
-        
+        self.recentFilesMenu.setEnabled(bool(self.recent_files)) #The menu itself is built lazily on aboutToShow
+
     def createEditActions(self, menu):
         undoAction = QAction('Undo', self)
         undoAction.setShortcut('Ctrl+Z')
-        undoAction.triggered.connect(self.textEdit.undo)
+        undoAction.triggered.connect(self.undo)
         menu.addAction(undoAction)
         self.actions['undo'] = undoAction
         redoAction = QAction('Redo', self)
@@ -342,102 +2475,927 @@ class Scratchpad(QMainWindow):
         findReplaceAction.setShortcut('Ctrl+F')
         menu.addAction(findReplaceAction)
         self.actions['findreplace'] = findReplaceAction
+        goToLineAction = QAction('Go To Line...', self)
+        goToLineAction.triggered.connect(self.goToLine)
+        goToLineAction.setShortcut('Ctrl+G')
+        menu.addAction(goToLineAction)
+        self.actions['gotoline'] = goToLineAction
+        menu.addSeparator()
+        spillUndoAction = QAction('Keep Old Undo Steps on Disk', self)
+        spillUndoAction.setCheckable(True)
+        spillUndoAction.setChecked(self.spill_undo_history)
+        spillUndoAction.toggled.connect(self.setSpillUndoHistory)
+        menu.addAction(spillUndoAction)
+        self.actions['spillundo'] = spillUndoAction
+
+    def createHelpActions(self, menu):
+        performanceAction = QAction('Performance...', self)
+        performanceAction.triggered.connect(self.openPerformanceDialog)
+        menu.addAction(performanceAction)
+        self.actions['performance'] = performanceAction
+
+    def openPerformanceDialog(self):
+        if self.performanceDialog is None:
+            self.performanceDialog = PerformanceDialog(self)
+        self.performanceDialog.show()
+        self.performanceDialog.raise_()
+        self.performanceDialog.activateWindow()
+
+    def tabs(self):
+        return [self.tabBar.tabData(index) for index in range(self.tabBar.count())]
+
+    def tabIndex(self, tab):
+        return next(index for index in range(self.tabBar.count()) if self.tabBar.tabData(index) is tab)
+
+    def createDocument(self, tab):
+        document = QTextDocument(self)
+        document.setDefaultFont(self.textEdit.font())
+        tab.undo_history = UndoHistory(document, self.undo_memory_budget, self.spill_undo_history)
+        document.contentsChange.connect(functools.partial(self.onContentsChange, tab))
+        document.contentsChange.connect(functools.partial(self.journalChange, tab))
+        document.modificationChanged.connect(lambda modified: self.updateTabTitle(tab))
+        tab.document = document
+
+    def newTab(self):
+        tab = DocumentTab()
+        self.createDocument(tab)
+        index = self.tabBar.addTab(tab.title())
+        self.tabBar.setTabData(index, tab)
+        self.activateTab(tab)
+        return tab
+
+    def onTabChanged(self, index):
+        # The first addTab() switches to the tab before its data is set; newTab() activates it instead
+        if index >= 0 and self.tabBar.tabData(index) is not None:
+            self.activateTab(self.tabBar.tabData(index))
+
+    def activateTab(self, tab):
+        if tab is self.tab:
+            return
+        previous = self.tab
+        if previous is not None:
+            previous.cursor_position = self.textEdit.textCursor().position()
+            previous.scroll_value = self.textEdit.verticalScrollBar().value()
+            previous.last_used = time.monotonic()
+            if previous.follower is not None:
+                previous.follower.pause()
+        self.tab = tab
+        tab.last_used = time.monotonic()
+        self.tabBar.setCurrentIndex(self.tabIndex(tab))
+        if tab.document is None:
+            self.restoreTab(tab)
+        unsaved_changes = tab.unsaved_changes
+        self.textEdit.setDocument(tab.document)
+        tab.unsaved_changes = unsaved_changes
+        self.textEdit.setReadOnly(tab.large_file_mode or tab.follower is not None)
+        cursor = QTextCursor(tab.document)
+        cursor.setPosition(min(tab.cursor_position, tab.document.characterCount() - 1))
+        self.textEdit.setTextCursor(cursor)
+        self.textEdit.verticalScrollBar().setValue(tab.scroll_value)
+        self.editorStack.setCurrentWidget(tab.large_view if tab.large_file_mode else self.textEdit)
+        if tab.follower is not None:
+            tab.follower.resume()
+        self.actions['follow'].setChecked(tab.follower is not None)
+        self.stats_generation += 1
+        self.stats_block = (-1, 0, 0)
+        if tab.stats_stale:
+            tab.stats_stale = False
+            self.recountTimer.start()
+        if self.findReplaceDialog is not None:
+            self.findReplaceDialog.document_changed()
+        self.updateLoadIndicator()
+        self.updateTabTitle(tab)
+        self.updateStatusBar()
+        self.enforceMemoryBudget()
+
+    def updateTabTitle(self, tab):
+        index = self.tabIndex(tab)
+        self.tabBar.setTabText(index, f"{tab.title()}{'*' if tab.isModified() else ''}")
+        self.tabBar.setTabToolTip(index, tab.current_file or '')
+        if tab is self.tab:
+            self.setWindowTitle(f"Scratchpad - {tab.title()}{' [Read-Only]' if tab.large_file_mode else ''}")
+
+    def closeTabAt(self, index):
+        tab = self.tabBar.tabData(index)
+        if self.confirmCloseTab(tab):
+            self.discardTab(tab)
+
+    def confirmCloseTab(self, tab):
+        # Only ask; loads and followers keep running until the close is confirmed and the tab shut down
+        if tab.isLoading() or not tab.isModified():
+            return True
+        self.activateTab(tab)
+        dialog = UnsavedWorkDialog(self)
+        result = dialog.exec()
+        if result == QDialog.DialogCode.Accepted:
+            self.saveFile()
+            if self.save_handler is not None and self.save_handler.isRunning():
+                self.save_handler.wait()
+                QApplication.processEvents()
+            return not tab.isModified()
+        return result == 2
+
+    def shutdownTab(self, tab):
+        self.cancelStreamingLoad(tab)
+        self.stopFollowing(tab)
+        self.closeLargeFile(tab)
+        tab.journal.discard()
+        if tab.undo_history is not None:
+            tab.undo_history.discard()
+        if tab.spill_path is not None:
+            os.unlink(tab.spill_path)
+            tab.spill_path = None
+
+    def discardTab(self, tab):
+        self.shutdownTab(tab)
+        if self.tabBar.count() == 1:
+            self.newTab()
+        self.tabBar.removeTab(self.tabIndex(tab))
+        if tab.large_view is not None:
+            self.editorStack.removeWidget(tab.large_view)
+            tab.large_view.deleteLater()
+        if tab.document is not None:
+            tab.document.deleteLater()
+            tab.document = None
+
+    def enforceMemoryBudget(self):
+        inactive = [tab for tab in self.tabs() if tab is not self.tab and tab.document is not None
+                    and not tab.large_file_mode and not tab.isLoading() and tab.follower is None]
+        usage = sum(tab.memoryUsage() for tab in inactive)
+        for tab in sorted(inactive, key=lambda tab: tab.last_used):
+            if usage <= self.tab_memory_budget:
+                break
+            usage -= tab.memoryUsage()
+            self.releaseTab(tab)
+
+    def releaseTab(self, tab):
+        document = tab.document
+        if document.isModified() or not tab.current_file:
+            fd, spill_path = tempfile.mkstemp(prefix='scratchpad-', suffix='.txt')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8', newline='') as file:
+                    file.write(document.toPlainText())
+            except OSError:
+                os.unlink(spill_path)
+                return
+            tab.spill_path = spill_path
+        tab.journal.flush()
+        tab.undo_history.discard()
+        tab.undo_history = None
+        tab.document = None
+        document.deleteLater()
+
+    def restoreTab(self, tab):
+        self.createDocument(tab)
+        if tab.spill_path is not None:
+            try:
+                with open(tab.spill_path, 'r', encoding='utf-8', newline='') as file:
+                    text = file.read()
+            except OSError as e:
+                QMessageBox.warning(self, "Error", f"Failed to restore {tab.title()} from {tab.spill_path}: {e}")
+                return
+            # The text is already in the journal, so keep these insertions out of it
+            tab.document.blockSignals(True)
+            with instrumentation.span('setPlainText'):
+                tab.document.setPlainText(text)
+            tab.document.blockSignals(False)
+            tab.undo_history.rebase()
+            tab.document.setModified(True)
+            os.unlink(tab.spill_path)
+            tab.spill_path = None
+        elif tab.current_file:
+            tab.reloading = True
+            self.startFileLoad(tab.current_file, tab=tab)
+
+    def undo(self):
+        history = self.tab.undo_history
+        if (history is not None and history.checkpoints and not self.tab.document.isUndoAvailable()
+                and not self.textEdit.isReadOnly()):
+            try:
+                history.restoreCheckpoint()
+            except OSError as e:
+                QMessageBox.warning(self, "Error", f"Failed to restore the spilled undo history: {e}")
+            return
+        self.textEdit.undo()
+
+    def makeUndoRoom(self, commands, removed):
+        if self.tab.undo_history is not None:
+            self.tab.undo_history.makeRoom(commands, removed)
+
+    def setSpillUndoHistory(self, enabled):
+        self.spill_undo_history = enabled
+        self.settings.setValue("spillUndoHistory", enabled)
+        for tab in self.tabs():
+            if tab.undo_history is not None:
+                tab.undo_history.spill = enabled
+
+    def eventFilter(self, watched, event):
+        if watched is self.textEdit and event.type() == QEvent.Type.KeyPress and self.tab.undo_history is not None:
+            if event.matches(QKeySequence.StandardKey.Undo):
+                self.undo()
+                return True
+            if self.tab.undo_history.typed(self.textEdit, event):
+                return True
+        return super().eventFilter(watched, event)
+
+    def goToLine(self):
+        document = self.textEdit.document()
+        if self.tab.large_file_mode:
+            view = self.tab.large_view
+            lines = f"{view.lineCount()}{'+' if view.isIndexing() else ''}"
+            current = f"{view.current_line + 1}"
+        else:
+            cursor = self.textEdit.textCursor()
+            lines = document.blockCount()
+            current = f"{cursor.blockNumber() + 1}:{cursor.columnNumber() + 1}"
+        text, ok = QInputDialog.getText(self, "Go To Line", f"Line[:Column] (1 - {lines}):", text=current)
+        if not ok:
+            return
+        match = re.fullmatch(r'\s*(\d+)\s*(?::\s*(\d+)\s*)?', text)
+        if match is None:
+            QMessageBox.warning(self, "Go To Line", f"'{text}' is not a line number.")
+            return
+        line = max(int(match.group(1)) - 1, 0)
+        column = max(int(match.group(2) or 1) - 1, 0)
+        if self.tab.large_file_mode:
+            self.tab.large_view.goToLine(line)
+            return
+        # QTextDocument keeps its blocks in a balanced tree, so finding a block by number is O(log n)
+        block = document.findBlockByNumber(min(line, document.blockCount() - 1))
+        cursor = QTextCursor(block)
+        cursor.setPosition(block.position() + min(column, block.length() - 1))
+        self.textEdit.setTextCursor(cursor)
+        scrollBar = self.textEdit.verticalScrollBar()
+        scrollBar.setValue(scrollBar.value() + self.textEdit.cursorRect().center().y()
+                           - self.textEdit.viewport().height() // 2)
+        self.textEdit.setFocus()
+
+    def toggleFollow(self, checked):
+        if checked:
+            self.startFollowing()
+            return
+        tab = self.tab
+        appended = tab.follower is not None and tab.follower.offset != tab.follower.start_offset
+        self.stopFollowing()
+        if appended and not tab.large_file_mode:
+            # The journal base no longer matches the document, so later edits need a snapshot to replay onto
+            tab.journal.snapshot(tab.document.toPlainText())
+
+    def startFollowing(self, tab=None):
+        tab = tab or self.tab
+        if tab is self.tab:
+            self.actions['follow'].setChecked(False)
+        if not tab.current_file or tab.load_cursor is not None:
+            QMessageBox.information(self, "Follow File", "Open a file before following it.")
+            return
+        if tab.compression is not None:
+            QMessageBox.information(self, "Follow File", "Compressed files cannot be followed.")
+            return
+        if tab.large_file_mode:
+            view = tab.large_view
+            offset, inode = len(view.mapping), os.fstat(view.file.fileno()).st_ino
+        elif tab.document.isModified():
+            QMessageBox.information(self, "Follow File", "Save or discard your changes before following the file.")
+            return
+        elif tab.follow_state is None:
+            # Only a streamed load records where the document ends in the file, so reload once
+            self.startFileLoad(tab.current_file, follow=True, tab=tab)
+            return
+        else:
+            offset, inode, decoder_state, encoding = tab.follow_state
+            tab.follow_decoder = io.IncrementalNewlineDecoder(
+                codecs.getincrementaldecoder(encoding)(errors='replace'), translate=True)
+            tab.follow_decoder.setstate(decoder_state)
+            if tab is self.tab:
+                self.textEdit.setReadOnly(True)
+            tab.document.setUndoRedoEnabled(False)
+            tab.undo_history.discard()
+        tab.follower = FileFollower(tab.current_file, offset, inode, self)
+        tab.follower.file_grew.connect(functools.partial(self.readFollowedFile, tab))
+        tab.follower.file_replaced.connect(functools.partial(self.reloadFollowedFile, tab))
+        if tab is self.tab:
+            self.actions['follow'].setChecked(True)
+            tab.follower.check()
+            self.updateStatusBar()
+        else:
+            tab.follower.pause()
+
+    def stopFollowing(self, tab=None):
+        tab = tab or self.tab
+        if tab.follower is None:
+            return
+        tab.follower.stop()
+        tab.follower.deleteLater()
+        tab.follower = None
+        if not tab.large_file_mode:
+            tab.follow_decoder = None
+            tab.document.setUndoRedoEnabled(True)
+            tab.undo_history.rebase()
+        if tab is self.tab:
+            self.actions['follow'].setChecked(False)
+            self.textEdit.setReadOnly(tab.large_file_mode)
+            self.updateStatusBar()
+
+    def readFollowedFile(self, tab, size=None):
+        if tab.follower is None:
+            return
+        if tab.large_file_mode:
+            tab.large_view.extend()
+            tab.follower.offset = len(tab.large_view.mapping)
+            return
+        try:
+            with open(tab.current_file, 'rb') as file:
+                if os.fstat(file.fileno()).st_ino != tab.follower.inode:
+                    self.reloadFollowedFile(tab)
+                    return
+                file.seek(tab.follower.offset)
+                data = file.read(self.follow_chunk_size)
+        except OSError:
+            return
+        tab.follower.offset += len(data)
+        text = tab.follow_decoder.decode(data)
+        encoding = tab.follow_state[3]
+        tab.follow_state = (tab.follower.offset, tab.follower.inode, tab.follow_decoder.getstate(), encoding)
+        if text:
+            scrollBar = self.textEdit.verticalScrollBar()
+            pinned = scrollBar.value() >= scrollBar.maximum() - 2
+            value = scrollBar.value()
+            cursor = QTextCursor(tab.document)
+            cursor.movePosition(QTextCursor.MoveOperation.End)
+            cursor.insertText(text)
+            scrollBar.setValue(scrollBar.maximum() if pinned else value)
+            tab.document.setModified(False)
+            tab.unsaved_changes = False
+            self.updateStatusBar()
+        if len(data) == self.follow_chunk_size:
+            QTimer.singleShot(0, functools.partial(self.readFollowedFile, tab))
+
+    def reloadFollowedFile(self, tab):
+        if tab.follower is not None:
+            self.startFileLoad(tab.current_file, follow=True, tab=tab)
 
     def openFindReplaceDialog(self):
-        dialog = FindReplaceDialog(self.textEdit)
-        dialog.exec_()
+        if self.tab.large_file_mode:
+            text, ok = QInputDialog.getText(self, "Find", "Find:", text=self.tab.large_find_text)
+            if ok and text:
+                self.tab.large_find_text = text
+                self.tab.large_view.findNext(text)
+            return
+        if self.findReplaceDialog is None:
+            self.findReplaceDialog = FindReplaceDialog(self.textEdit, self)
+            self.findReplaceDialog.replacing_all.connect(self.makeUndoRoom)
+        cursor = self.textEdit.textCursor()
+        if cursor.hasSelection() and '\u2029' not in cursor.selectedText():
+            self.findReplaceDialog.find_input.setText(cursor.selectedText())
+        self.findReplaceDialog.show()
+        self.findReplaceDialog.raise_()
+        self.findReplaceDialog.activateWindow()
 
     def importFromWeb(self):
-        dialog = ImportFromWebDialog(self.textEdit)
-        dialog.exec()
+        dialog = ImportFromWebDialog(self)
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            self.startWebImport(dialog.url())
+
+    def startWebImport(self, url):
+        tab = self.tab if self.tab.isPristine() else self.newTab()
+        fetcher = WebFetcher(url, self.web_import_limit)
+        fetcher.fetch_started.connect(functools.partial(self.beginStreamingLoad, tab, fetcher))
+        fetcher.content_fetched.connect(functools.partial(self.loadFileContent, tab, fetcher))
+        fetcher.fetch_progress.connect(functools.partial(self.updateLoadProgress, tab, fetcher))
+        fetcher.fetch_finished.connect(functools.partial(self.finishWebImport, tab, fetcher))
+        fetcher.fetch_failed.connect(functools.partial(self.failFileLoad, tab, fetcher))
+        tab.web_fetcher = fetcher
+        self.statusBar.showMessage(f"Fetching {url}...")
+        fetcher.start()
+
+    def cancelWebImport(self, tab=None):
+        tab = tab or self.tab
+        fetcher = tab.web_fetcher
+        if fetcher is not None and fetcher.isRunning():
+            fetcher.abort()
+            for signal in (fetcher.fetch_started, fetcher.content_fetched, fetcher.fetch_progress,
+                           fetcher.fetch_finished, fetcher.fetch_failed):
+                signal.disconnect()
+            self.finishWebImport(tab, fetcher, False)
+            tab.web_fetcher = None
+            # The thread winds down on its own; it only has to outlive its QThread object until it does
+            self.detached_fetchers.add(fetcher)
+            fetcher.finished.connect(functools.partial(self.detached_fetchers.discard, fetcher))
+            if fetcher.isFinished():
+                self.detached_fetchers.discard(fetcher)
+
+    def cancelStreamingLoad(self, tab=None):
+        tab = tab or self.tab
+        self.cancelFileLoad(tab)
+        self.cancelWebImport(tab)
+
+    def finishWebImport(self, tab, source, completed):
+        if source is not tab.web_fetcher or tab.load_cursor is None:
+            return
+        if completed and tab.pending_text:
+            tab.after_insert = functools.partial(self.finishWebImport, tab, source, completed)
+            return
+        self.finishStreamingLoad(tab)
+        if completed:
+            tab.current_file = None
+            tab.compression = None
+            tab.lossy = False
+            if tab is self.tab:
+                self.textEdit.moveCursor(QTextCursor.MoveOperation.Start)
+            tab.document.setModified(True)
+            tab.unsaved_changes = True
+            tab.follow_state = None
+            tab.journal.reset(None)
+            tab.journal.snapshot(tab.document.toPlainText())
+            self.updateTabTitle(tab)
+        else:
+            self.discardPartialLoad(tab)
+        self.updateStatusBar()
 
     def newFile(self):
-        self.current_file = None
-        self.textEdit.clear()
-        self.setWindowTitle('Scratchpad - Unnamed')
+        self.newTab()
 
     def openFile(self):
-        options = QFileDialog.Options()
         try:
-            file_name, _ = QFileDialog.getOpenFileName(self, "Open File", "", "Text Files (*.txt);;All Files (*)", options=options)
-            if file_name:
-                self.current_file = file_name
-                self.file_handler = FileHandler(file_name)
-                self.file_handler.file_content_loaded.connect(self.loadFileContent)
-                self.file_handler.start()
+            file_names, _ = QFileDialog.getOpenFileNames(self, "Open File", "", "Text Files (*.txt);;All Files (*)")
+            for file_name in file_names:
+                self.openPath(file_name)
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Failed to open file: {e}")
 
-    def loadFileContent(self, content, encoding):
+    def openPath(self, file_path):
+        for tab in self.tabs():
+            open_path = tab.current_file or (tab.loader.file_path if tab.loader is not None else None)
+            if open_path and os.path.abspath(open_path) == os.path.abspath(file_path):
+                self.activateTab(tab)
+                return tab
+        tab = self.tab if self.tab.isPristine() else self.newTab()
+        self.startFileLoad(file_path, tab=tab)
+        return tab
+
+    def startFileLoad(self, file_path, follow=False, tab=None):
+        tab = tab or self.tab
+        self.stopFollowing(tab)
+        self.cancelStreamingLoad(tab)
+        tab.follow_after_load = follow
+        try:
+            size = os.path.getsize(file_path)
+        except OSError:
+            size = 0
+        # A compressed file cannot be memory-mapped, so it always streams into the editor
+        if size >= self.large_file_threshold and file_compression(file_path) is None:
+            self.openLargeFile(file_path, tab)
+            return
+        self.closeLargeFile(tab)
+        task = FileLoadTask(file_path, follow)
+        task.signals.file_load_started.connect(functools.partial(self.beginStreamingLoad, tab, task))
+        task.signals.file_content_loaded.connect(functools.partial(self.loadFileContent, tab, task))
+        task.signals.file_load_progress.connect(functools.partial(self.updateLoadProgress, tab, task))
+        task.signals.file_load_finished.connect(functools.partial(self.finishFileLoad, tab, task))
+        task.signals.file_load_failed.connect(functools.partial(self.failFileLoad, tab, task))
+        tab.loader = task
+        self.updateLoadIndicator()
+        self.loaderPool.start(task)
+
+    def largeViewFor(self, tab):
+        if tab.large_view is None:
+            tab.large_view = LargeFileView(self)
+            tab.large_view.current_line_changed.connect(self.updateStatusBar)
+            tab.large_view.index_progress.connect(self.updateStatusBar)
+            self.editorStack.addWidget(tab.large_view)
+        return tab.large_view
+
+    def openLargeFile(self, file_path, tab=None):
+        tab = tab or self.tab
+        view = self.largeViewFor(tab)
+        try:
+            encoding = detect_encoding(file_path)
+            view.open(file_path, encoding)
+        except Exception as e:
+            self.closeLargeFile(tab)
+            tab.follow_after_load = False
+            self.reportStartup()
+            QMessageBox.critical(self, "Error", f"Error reading file: {e}")
+            return
+        tab.large_file_mode = True
+        tab.document.clear()
+        tab.follow_state = None
+        tab.journal.reset(None)
+        tab.document.setModified(False)
+        tab.unsaved_changes = False
+        tab.encoding = view.encoding
+        tab.current_file = file_path
+        if tab is self.tab:
+            self.editorStack.setCurrentWidget(view)
+            self.textEdit.setReadOnly(True)
+            view.setFocus()
+        self.updateTabTitle(tab)
+        self.addToRecentFiles(file_path)
+        self.updateStatusBar()
+        self.reportStartup()
+        if tab.follow_after_load:
+            tab.follow_after_load = False
+            self.startFollowing(tab)
+
+    def closeLargeFile(self, tab=None):
+        tab = tab or self.tab
+        if not tab.large_file_mode:
+            return
+        self.stopFollowing(tab)
+        tab.large_view.close()
+        tab.large_file_mode = False
+        if tab is self.tab:
+            self.textEdit.setReadOnly(False)
+            self.editorStack.setCurrentWidget(self.textEdit)
+
+    def cancelFileLoad(self, tab=None):
+        tab = tab or self.tab
+        task = tab.loader
+        if task is not None:
+            # A task still queued on the pool sees the flag as soon as it starts and exits at once
+            task.cancel()
+            self.finishFileLoad(tab, task, False)
+
+    def beginStreamingLoad(self, tab, source, encoding, total):
+        if source is not tab.loader and source is not tab.web_fetcher:
+            return
         if encoding:
-            self.encoding = encoding
-        if content.startswith("Error reading file"):
-            QMessageBox.critical(self, "Error", content)
+            tab.encoding = encoding
+        document = tab.document
+        document.setUndoRedoEnabled(False)
+        tab.load_cursor = QTextCursor(document)
+        document.clear()
+        tab.load_progress = (0, max(total, 1))
+        self.updateLoadIndicator()
+
+    def loadFileContent(self, tab, source, content, encoding):
+        if source is not tab.loader and source is not tab.web_fetcher:
+            source.chunk_slots.release()
+            return
+        tab.pending_text.append([source, content, 0])
+        self.insertTimer.start()
+
+    def insertPendingText(self):
+        deadline = time.perf_counter() + self.insert_budget
+        for tab in self.tabs():
+            while tab.pending_text and time.perf_counter() < deadline:
+                entry = tab.pending_text[0]
+                source, content, offset = entry
+                piece = content[offset:offset + self.insert_piece_size]
+                with instrumentation.span('loadFileContent'):
+                    tab.load_cursor.movePosition(QTextCursor.MoveOperation.End)
+                    tab.load_cursor.beginEditBlock()
+                    tab.load_cursor.insertText(piece)
+                    tab.load_cursor.endEditBlock()
+                entry[2] = offset + len(piece)
+                if entry[2] >= len(content):
+                    tab.pending_text.popleft()
+                    source.chunk_slots.release()
+            if not tab.pending_text and tab.after_insert is not None:
+                after_insert, tab.after_insert = tab.after_insert, None
+                after_insert()
+        if any(tab.pending_text for tab in self.tabs()):
+            self.insertTimer.start()
+
+    def dropPendingText(self, tab):
+        while tab.pending_text:
+            tab.pending_text.popleft()[0].chunk_slots.release()
+        tab.after_insert = None
+
+    def updateLoadProgress(self, tab, source, loaded, total):
+        if tab.load_progress is None or (source is not tab.loader and source is not tab.web_fetcher):
+            return
+        tab.load_progress = (loaded, tab.load_progress[1])
+        if tab is self.tab:
+            self.loadProgress.setValue(min(loaded, self.loadProgress.maximum()))
+
+    def updateLoadIndicator(self):
+        tab = self.tab
+        if tab.load_progress is not None:
+            loaded, total = tab.load_progress
+            self.loadProgress.setRange(0, total)
+            self.loadProgress.setValue(min(loaded, total))
+            self.loadProgress.show()
+        elif tab.loader is not None:
+            self.loadProgress.setRange(0, 0)
+            self.loadProgress.show()
         else:
-            self.textEdit.setPlainText(content)
-            self.setWindowTitle(f'Scratchpad - {os.path.basename(self.current_file)}')
-            if self.current_file:
-                self.addToRecentFiles(self.current_file)
+            self.loadProgress.hide()
+        self.cancelLoadButton.setVisible(tab.isLoading())
+
+    def finishStreamingLoad(self, tab):
+        self.dropPendingText(tab)
+        tab.load_cursor = None
+        tab.load_progress = None
+        if tab is self.tab:
+            self.updateLoadIndicator()
+            if tab.stats_stale:
+                tab.stats_stale = False
+                self.stats_block = (-1, 0, 0)
+                self.recountTimer.start()
+        document = tab.document
+        document.setUndoRedoEnabled(True)
+        tab.undo_history.rebase()
+        document.setModified(False)
+        tab.unsaved_changes = False
+
+    def discardPartialLoad(self, tab):
+        tab.current_file = None
+        tab.follow_state = None
+        tab.document.clear()
+        tab.undo_history.rebase()
+        tab.journal.reset(None)
+        tab.document.setModified(False)
+        tab.unsaved_changes = False
+        self.updateTabTitle(tab)
+
+    def finishFileLoad(self, tab, source, completed):
+        if source is not tab.loader:
+            return
+        if completed and tab.pending_text:
+            tab.after_insert = functools.partial(self.finishFileLoad, tab, source, completed)
+            return
+        tab.loader = None
+        reloading, tab.reloading = tab.reloading, False
+        follow, tab.follow_after_load = tab.follow_after_load, False
+        if tab.load_cursor is None:
+            if tab is self.tab:
+                self.updateLoadIndicator()
+            return
+        self.finishStreamingLoad(tab)
+        if completed:
+            tab.current_file = source.file_path
+            tab.compression = source.compression
+            tab.encoding = source.encoding
+            tab.lossy = source.lossy
+            # The state belongs to the codec the loader ended up decoding with
+            if source.decoder_state is not None:
+                tab.follow_state = (source.end_offset, source.inode, source.decoder_state, source.encoding)
+            else:
+                tab.follow_state = None
+            if reloading:
+                position = min(tab.cursor_position, tab.document.characterCount() - 1)
+            elif follow:
+                position = tab.document.characterCount() - 1
+            else:
+                position = 0
+            if tab is self.tab:
+                cursor = QTextCursor(tab.document)
+                cursor.setPosition(position)
+                self.textEdit.setTextCursor(cursor)
+                if reloading:
+                    self.textEdit.verticalScrollBar().setValue(tab.scroll_value)
+            else:
+                tab.cursor_position = position
+            self.updateTabTitle(tab)
+            self.addToRecentFiles(tab.current_file)
+            tab.journal.reset(self.fileJournalBase(tab.current_file, tab.encoding, tab.compression))
+        else:
+            self.discardPartialLoad(tab)
+        self.updateStatusBar()
+        self.reportStartup()
+        if completed and follow:
+            self.startFollowing(tab)
+        self.enforceMemoryBudget()
+
+    def failFileLoad(self, tab, source, message):
+        if source is not tab.loader and source is not tab.web_fetcher:
+            return
+        if source is tab.loader:
+            tab.loader = None
+        tab.reloading = False
+        tab.follow_after_load = False
+        if tab.load_cursor is not None:
+            self.finishStreamingLoad(tab)
+            self.discardPartialLoad(tab)
+        elif tab is self.tab:
+            self.updateLoadIndicator()
+        self.reportStartup()
+        QMessageBox.critical(self, "Error", message)
+
+    def reportStartup(self):
+        if self.startup_profile is not None and not self.startup_profile.reported:
+            self.startup_profile.mark('first file load')
+            self.startup_profile.report()
 
     def saveFile(self):
         """Save the current file."""
-        content = self.textEdit.toPlainText()
-        if self.encoding is None:
-            self.encoding = 'utf-8'
-        try:
-            content.encode(self.encoding)
-            if self.current_file:
-                self.saveFileWithEncoding(content, self.encoding)
-                self.unsaved_changes = False
-                self.updateStatusBar(after_save=True)
-            else:
-                self.saveFileAs()
-        except UnicodeEncodeError:
-            self.promptForEncoding(content)
+        tab = self.tab
+        if tab.large_file_mode:
+            QMessageBox.information(self, "Read-Only", "Large files are opened read-only.")
+            return
+        if tab.encoding is None:
+            tab.encoding = 'utf-8'
+        if tab.lossy and tab.current_file:
+            answer = QMessageBox.warning(
+                self, "Undecodable Bytes",
+                f"Some bytes in this file were not valid {tab.encoding} and were shown as \ufffd. "
+                "Saving replaces the original bytes with that character. Save anyway?",
+                QMessageBox.StandardButton.Save | QMessageBox.StandardButton.Cancel,
+                QMessageBox.StandardButton.Cancel)
+            if answer != QMessageBox.StandardButton.Save:
+                return
+        if tab.current_file:
+            self.saveFileWithEncoding(self.textEdit.toPlainText(), tab.encoding)
+        else:
+            self.saveFileAs()
 
     def promptForEncoding(self, content):
-        encoding, ok = QInputDialog.getItem(self, "Choose Encoding", "Select Encoding", 
+        encoding, ok = QInputDialog.getItem(self, "Choose Encoding", "Select Encoding",
                                              ["UTF-8", "ISO-8859-1", "Windows-1252", "UTF-16"], 0, False)
         if ok:
             self.saveFileWithEncoding(content, encoding)
-    
+
     def saveFileWithEncoding(self, content, encoding):
-        if self.current_file:
-            try:
-                with open(self.current_file, 'w', encoding=encoding) as file:
-                    file.write(content)
-                self.unsaved_changes = False
-                self.updateStatusBar(after_save=True)
-            except Exception as e:
-                QMessageBox.warning(self, "Error", f"Failed to save file with encoding '{encoding}': {e}")
+        if not self.tab.current_file:
+            return
+        if self.save_handler is not None and self.save_handler.isRunning():
+            self.statusBar.showMessage("A save is already in progress.")
+            return
+        self.save_tab = self.tab
+        self.save_revision = self.textEdit.document().revision()
+        self.save_handler = FileHandler(self.tab.current_file, content, encoding, self.tab.compression)
+        self.save_handler.file_save_progress.connect(self.updateSaveProgress)
+        self.save_handler.file_encoding_error.connect(self.handleSaveEncodingError)
+        self.save_handler.file_saved.connect(self.handleSaveFile)
+        self.loadProgress.setRange(0, max(len(content), 1))
+        self.loadProgress.setValue(0)
+        self.loadProgress.show()
+        self.save_handler.start()
 
+    def updateSaveProgress(self, saved, total):
+        self.loadProgress.setValue(min(saved, self.loadProgress.maximum()))
+
+    def handleSaveEncodingError(self, encoding):
+        self.loadProgress.hide()
+        self.save_handler.wait()
+        self.activateTab(self.save_tab)
+        self.promptForEncoding(self.textEdit.toPlainText())
 
     def handleSaveFile(self, success):
+        self.loadProgress.hide()
+        tab = self.save_tab
         if success:
-            self.unsaved_changes = False
-            self.updateStatusBar()
+            tab.encoding = self.save_handler.encoding
+            tab.lossy = False
+            if tab.document is not None and tab.document.revision() == self.save_revision:
+                tab.document.setModified(False)
+                tab.unsaved_changes = False
+                tab.journal.reset(self.fileJournalBase(self.save_handler.file_path, tab.encoding,
+                                                       self.save_handler.compression))
+            tab.follow_state = None
+            self.updateTabTitle(tab)
+            if tab is self.tab:
+                self.updateStatusBar(after_save=not tab.unsaved_changes)
         else:
-            QMessageBox.warning(self, "Error", "Failed to save file!")
+            QMessageBox.warning(self, "Error", f"Failed to save file with encoding '{self.save_handler.encoding}': {self.save_handler.error}")
 
     def saveFileAs(self):
+        if self.tab.large_file_mode:
+            QMessageBox.information(self, "Read-Only", "Large files are opened read-only.")
+            return
         options = QFileDialog.Option(1)
         try:
             file_name, _ = QFileDialog.getSaveFileName(self, "Save File As", "", "Text Files (*.txt);;All Files (*)", options=options)
             if file_name:
-                self.current_file = file_name
+                self.tab.current_file = file_name
+                self.tab.compression = COMPRESSION_SUFFIXES.get(os.path.splitext(file_name)[1].lower())
                 self.saveFile()
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Failed to save file: {e}")
 
+    def cacheStatsBlock(self, block):
+        text = block.text()
+        self.stats_block = (block.blockNumber(), len(text), len(text.split()))
+
+    def onContentsChange(self, tab, position, removed, added):
+        if tab is not self.tab:
+            tab.stats_stale = True
+            return
+        self.stats_generation += 1
+        document = tab.document
+        block = document.findBlock(position)
+        number, length, words = self.stats_block
+        if (number == block.blockNumber() and position - block.position() + removed <= length
+                and added <= self.stats_incremental_limit):
+            end = document.findBlock(position + added)
+            new_words = 0
+            while True:
+                new_words += len(block.text().split())
+                if block == end or not block.isValid():
+                    break
+                block = block.next()
+            tab.word_count += new_words - words
+            self.cacheStatsBlock(end)
+        else:
+            self.stats_block = (-1, 0, 0)
+            self.recountTimer.start()
+
+    def journalChange(self, tab, position, removed, added):
+        if tab.load_cursor is not None or tab.large_file_mode or tab.follower is not None:
+            return
+        document = tab.document
+        length = document.characterCount() - 1
+        cursor = QTextCursor(document)
+        cursor.setPosition(min(position, length))
+        cursor.setPosition(min(position + added, length), QTextCursor.MoveMode.KeepAnchor)
+        tab.journal.record(position, removed, cursor.selectedText().replace('\u2029', '\n'), length)
+
+    def flushJournal(self):
+        for tab in self.tabs():
+            if tab.document is None:
+                continue
+            if tab.journal.needsCompaction(tab.document.characterCount()):
+                tab.journal.snapshot(tab.document.toPlainText())
+            else:
+                tab.journal.flush()
+
+    def fileJournalBase(self, file_path, encoding, compression=None):
+        file_stat = os.stat(file_path)
+        return {'file_path': file_path, 'encoding': encoding, 'compression': compression,
+                'size': file_stat.st_size, 'mtime_ns': file_stat.st_mtime_ns}
+
+    def offerRecovery(self):
+        for meta in find_recoverable_journals():
+            name = os.path.basename(meta.get('file_path') or '') or 'Unnamed'
+            answer = QMessageBox.question(self, "Recover Unsaved Changes",
+                                          f"Scratchpad was not closed cleanly. Recover unsaved changes to {name}?")
+            if answer == QMessageBox.StandardButton.Yes:
+                try:
+                    text, complete = replay_journal(meta)
+                except (OSError, ValueError, KeyError) as e:
+                    QMessageBox.warning(self, "Recovery Failed", f"Could not recover {name}: {e}")
+                    continue
+                if not complete:
+                    QMessageBox.warning(self, "Recovery Incomplete",
+                                        f"The journal for {name} is damaged; only the changes before the damage were recovered.")
+                tab = self.tab if self.tab.isPristine() else self.newTab()
+                self.restoreRecoveredText(tab, text, meta)
+            for path in meta['paths']:
+                if os.path.exists(path):
+                    os.unlink(path)
+
+    def restoreRecoveredText(self, tab, text, meta):
+        self.closeLargeFile(tab)
+        with instrumentation.span('setPlainText'):
+            tab.document.setPlainText(text)
+        tab.undo_history.rebase()
+        tab.current_file = meta.get('file_path')
+        if meta.get('encoding'):
+            tab.encoding = meta['encoding']
+        tab.compression = meta.get('compression')
+        tab.journal.reset(None)
+        tab.journal.snapshot(text)
+        tab.document.setModified(True)
+        tab.unsaved_changes = True
+        self.updateTabTitle(tab)
+        self.updateStatusBar()
+
+    def recountStats(self):
+        if self.tab.load_cursor is not None:
+            # Counting on a worker still holds the GIL for the whole text, so a document that is streaming
+            # in is counted once when the load ends instead of again every half second
+            self.tab.stats_stale = True
+            return
+        if self.stats_counter is not None and self.stats_counter.isRunning():
+            self.recountTimer.start()
+            return
+        self.stats_counter = StatsCounter(self.textEdit.toPlainText(), self.stats_generation)
+        self.stats_counter.words_counted.connect(self.onStatsCounted)
+        self.stats_counter.start()
+
+    def onStatsCounted(self, words, generation):
+        if generation != self.stats_generation:
+            self.recountTimer.start()
+            return
+        self.tab.word_count = words
+        self.updateStatusBar()
+
+    @timed('updateStatusBar')
     def updateStatusBar(self, after_save=False):
+        tab = self.tab
+        if tab.large_file_mode:
+            view = tab.large_view
+            self.line = view.current_line + 1
+            lines = f"{view.lineCount()}{'+' if view.isIndexing() else ''}"
+            following = " | Following" if tab.follower is not None else ""
+            self.statusBar.showMessage(f"Line: {self.line} of {lines} | Encoding: {tab.encoding} | Read-Only{following}")
+            return
         cursor = self.textEdit.textCursor()
+        document = self.textEdit.document()
         self.line = cursor.blockNumber() + 1
         self.column = cursor.columnNumber() + 1
-        self.char_count = len(self.textEdit.toPlainText())
+        self.char_count = document.characterCount() - 1
+        if self.stats_block[0] != cursor.blockNumber():
+            self.cacheStatsBlock(cursor.block())
+        words = f"{tab.word_count}{'~' if self.recountTimer.isActive() else ''}"
         asterisk = ""
         if not after_save:
-            asterisk = "*" if self.unsaved_changes else ""
-        self.statusBar.showMessage(f"Line: {self.line} | Column: {self.column} | Characters: {self.char_count} | Encoding: {self.encoding} {asterisk}")
+            asterisk = "*" if tab.unsaved_changes else ""
+        if tab.follower is not None:
+            asterisk = "| Following"
+        compression = f" ({tab.compression})" if tab.compression else ""
+        self.statusBar.showMessage(f"Line: {self.line} of {document.blockCount()} | Column: {self.column} | Characters: {self.char_count} | Words: {words} | Encoding: {tab.encoding}{compression} {asterisk}")
     #Line 433 -> 463 relates to recent files and opening them
     def loadRecentFiles(self):
         self.settings = QSettings("Scratchpad", "ScratchpadApp")
@@ -470,10 +3428,7 @@ class Scratchpad(QMainWindow):
 
     def openRecentFile(self, file_path):
         if os.path.exists(file_path):
-            self.current_file = file_path
-            self.file_handler = FileHandler(file_path)
-            self.file_handler.file_content_loaded.connect(self.loadFileContent)
-            self.file_handler.start()
+            self.openPath(file_path)
         else:
             QMessageBox.warning(self, "File Not Found", f"File not found: {file_path}")
             if file_path in self.recent_files:
@@ -487,13 +3442,304 @@ class Scratchpad(QMainWindow):
         self.updateRecentFilesMenu()
         
 
+""" Utility function to replace every non-empty match in a stream of decoded text pieces
+
+Yields (text, matches) per piece, or ('', matches) when replacement is None. Matches ending within the
+last `overlap` characters are held back until the next piece arrives, so a match only goes unseen if it
+is longer than `overlap`.
+"""
+def stream_replace(pieces, pattern, replacement, expand=False, overlap=64 * 1024):
+    pieces = iter(pieces)
+    expansions = {}
+    carry = ''
+    context = 0
+    final = False
+    while not final:
+        text = next(pieces, None)
+        final = text is None
+        buffer = carry + text if text else carry
+        limit = len(buffer) if final else len(buffer) - overlap
+        if limit <= context:
+            carry = buffer
+            continue
+        output = []
+        position = context
+        count = 0
+        cut = limit
+        for match in pattern.finditer(buffer, context):
+            start, end = match.span()
+            if start == end:
+                continue
+            if end > limit:
+                cut = min(start, limit)
+                break
+            if replacement is not None:
+                output.append(buffer[position:start])
+                if expand:
+                    # match.expand parses the template on every call; repeated matches reuse its result
+                    key = (match.group(), match.groups())
+                    text = expansions.get(key)
+                    if text is None:
+                        if len(expansions) > 4096:
+                            expansions.clear()
+                        text = expansions[key] = match.expand(replacement)
+                    output.append(text)
+                else:
+                    output.append(replacement)
+            position = end
+            count += 1
+        if replacement is not None:
+            output.append(buffer[position:cut])
+        yield ''.join(output), count
+        # Keep a little of the processed text so lookbehinds, ^ and \b still see what precedes the cut
+        context = min(cut, overlap)
+        carry = buffer[cut - context:]
+
+
+
+""" Utility function to find/replace and re-encode one file for --batch; runs in a worker process """
+def batch_process_file(file_path, options):
+    result = {'path': file_path}
+    try:
+        compression = file_compression(file_path)
+        sample = None
+        if compression is not None:
+            with open(file_path, 'rb') as raw:
+                compression, stream, sample = open_compressed(raw, compression, ENCODING_SAMPLE_SIZE)
+            if compression is not None:
+                stream.close()
+                result['compression'] = compression
+            else:
+                sample = None
+        encoding = detect_encoding(file_path, sample)
+
+        def pieces(decoder):
+            with open(file_path, 'rb') as raw, compression_stream(raw, compression) as file:
+                for chunk in iter(functools.partial(file.read, options['chunk_size']), b''):
+                    yield decoder.decode(chunk)
+            yield decoder.flush()
+
+        pattern = None
+        if options['find']:
+            pattern = compile_search_pattern(options['find'], options['regex'], options['case_sensitive'],
+                                             options['whole_word'])
+        replace = pattern is not None and options['replace'] is not None
+        decoder = FallbackDecoder(encoding)
+        if options['dry_run'] or not replace and not options['encoding']:
+            # Nothing is written, so the only pass needed is the one that counts
+            if pattern is not None:
+                result['matches'] = sum(count for _, count in
+                                        stream_replace(pieces(decoder), pattern, None, overlap=options['overlap']))
+            changed = (replace and result['matches']
+                       or codecs.lookup(options['encoding'] or decoder.encoding).name
+                       != codecs.lookup(decoder.encoding).name)
+        else:
+            changed = batch_rewrite(file_path, compression, pieces(decoder), decoder, pattern, options, result)
+            if changed is None:
+                # Replacement text was already written in the old encoding when the file turned out not to be UTF-8
+                decoder = FallbackDecoder(decoder.encoding)
+                changed = batch_rewrite(file_path, compression, pieces(decoder), decoder, pattern, options, result)
+        result['encoding'] = decoder.encoding
+        target_encoding = options['encoding'] or decoder.encoding
+        if target_encoding != decoder.encoding:
+            result['target_encoding'] = target_encoding
+        if not changed:
+            result['status'] = 'unchanged'
+        elif options['dry_run']:
+            result['status'] = 'would change'
+        else:
+            result['status'] = 'changed'
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = str(e)
+    return result
+
+
+
+""" Utility function to find/replace and re-encode one --batch file in a single pass over it
+
+Matches are counted while the new file is written, and the new file is dropped again if nothing changed.
+Returns whether the file changed, or None if it has to be redone because the decoder switched encodings
+after non-ASCII text had been written in the old one.
+"""
+def batch_rewrite(file_path, compression, texts, decoder, pattern, options, result):
+    replacement = options['replace']
+    matches = 0
+    changed = redo = False
+    encoding = encoder = None
+    ascii_only = True
+    with atomic_write(file_path) as raw, compression_stream(raw, compression, 'wb') as file:
+        def write(text):
+            nonlocal encoding, encoder, ascii_only, redo
+            target = options['encoding'] or decoder.encoding
+            if target != encoding:
+                if not ascii_only:
+                    redo = True
+                    raise WriteDiscarded
+                encoding = target
+                encoder = codecs.getincrementalencoder(encoding)(errors='strict')
+            ascii_only = ascii_only and text.isascii()
+            file.write(encoder.encode(text))
+
+        if pattern is None:
+            for text in texts:
+                write(text)
+        elif replacement is not None:
+            expand = options['regex'] and '\\' in replacement
+            for text, count in stream_replace(texts, pattern, replacement, expand, options['overlap']):
+                matches += count
+                write(text)
+        else:
+            # Counting alone only has to see the text on its way to the file
+            def written(texts):
+                for text in texts:
+                    write(text)
+                    yield text
+            matches = sum(count for _, count in
+                          stream_replace(written(texts), pattern, None, overlap=options['overlap']))
+        if encoder is not None:
+            file.write(encoder.encode('', final=True))
+        if pattern is not None:
+            result['matches'] = matches
+        changed = (replacement is not None and matches > 0
+                   or codecs.lookup(options['encoding'] or decoder.encoding).name
+                   != codecs.lookup(decoder.encoding).name)
+        if not changed:
+            raise WriteDiscarded
+    return None if redo else changed
+
+
+
+""" Utility function to list the files named on the --batch command line, walking directories """
+def batch_files(paths, include):
+    import fnmatch
+    files = []
+    for path in paths:
+        if not os.path.isdir(path):
+            files.append(path)
+            continue
+        for directory, subdirectories, names in os.walk(path):
+            subdirectories.sort()
+            files.extend(os.path.join(directory, name) for name in sorted(names)
+                         if any(fnmatch.fnmatch(name, pattern) for pattern in include))
+    return files
+
+
+
+""" Headless entry point: scratchpad.py --batch [options] PATH... """
+def run_batch(arguments):
+    import argparse
+    parser = argparse.ArgumentParser(prog='scratchpad.py --batch',
+                                     description="Find/replace and re-encode files without opening the editor.")
+    parser.add_argument('--batch', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('paths', nargs='+', metavar='PATH', help="files, or directories to walk")
+    parser.add_argument('--find', help="text (or pattern with --regex) to search for")
+    parser.add_argument('--replace', help="replacement text; regex mode accepts \\1 and \\g<name>")
+    parser.add_argument('--regex', action='store_true')
+    parser.add_argument('--case-sensitive', action='store_true')
+    parser.add_argument('--whole-word', action='store_true')
+    parser.add_argument('--encoding', help="re-encode every file to this encoding")
+    parser.add_argument('--include', action='append', metavar='GLOB',
+                        help="file name pattern to pick up inside directories (repeatable, default *)")
+    parser.add_argument('--dry-run', action='store_true', help="count matches and report, but write nothing")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument('--chunk-size', type=int, default=1024 * 1024, help="bytes read per chunk")
+    parser.add_argument('--overlap', type=int, default=64 * 1024,
+                        help="characters held back between chunks; longer matches may be missed")
+    parser.add_argument('--summary', metavar='FILE', help="write the JSON summary here instead of stdout")
+    args = parser.parse_args(arguments)
+    if not args.find and not args.encoding:
+        parser.error("nothing to do: give --find and/or --encoding")
+    if args.replace is not None and not args.find:
+        parser.error("--replace needs --find")
+    if args.jobs < 1 or args.chunk_size < 1 or args.overlap < 0:
+        parser.error("--jobs and --chunk-size must be positive and --overlap non-negative")
+    try:
+        if args.encoding:
+            codecs.lookup(args.encoding)
+        if args.find:
+            pattern = compile_search_pattern(args.find, args.regex, args.case_sensitive, args.whole_word)
+            if args.regex and args.replace is not None:
+                pattern.sub(args.replace, '')
+    except (LookupError, re.error) as e:
+        parser.error(str(e))
+
+    started = time.perf_counter()
+    files = batch_files(args.paths, args.include or ['*'])
+    options = dict(find=args.find, replace=args.replace, regex=args.regex, case_sensitive=args.case_sensitive,
+                   whole_word=args.whole_word, encoding=args.encoding, dry_run=args.dry_run,
+                   chunk_size=args.chunk_size, overlap=args.overlap)
+    jobs = min(args.jobs, len(files))
+    if jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        # Largest files first, so one big file does not start last and leave the other workers idle
+        order = sorted(range(len(files)), key=lambda i: os.path.getsize(files[i]) if os.path.isfile(files[i]) else 0,
+                       reverse=True)
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            done = executor.map(batch_process_file, [files[i] for i in order], [options] * len(files),
+                                chunksize=max(1, len(files) // (jobs * 8)))
+            results = [None] * len(files)
+            for i, result in zip(order, done):
+                results[i] = result
+    else:
+        results = [batch_process_file(file_path, options) for file_path in files]
+
+    statuses = [result['status'] for result in results]
+    summary = {
+        'dry_run': args.dry_run,
+        'files': results,
+        'totals': {
+            'files': len(results),
+            'matches': sum(result.get('matches', 0) for result in results),
+            'changed': statuses.count('would change' if args.dry_run else 'changed'),
+            'failed': statuses.count('failed'),
+        },
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+    output = json.dumps(summary, indent=2)
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as summary_file:
+            summary_file.write(output + '\n')
+    else:
+        print(output)
+    return 1 if summary['totals']['failed'] else 0
+
+
+
 """ Start the program """
 if __name__ == '__main__':
+    if '--batch' in sys.argv:
+        sys.exit(run_batch(sys.argv[1:]))
+    startup_profile = StartupProfile() if '--startup-profile' in sys.argv else None
+    if startup_profile:
+        startup_profile.mark('imports')
+    file_arguments = [os.path.abspath(argument) for argument in sys.argv[1:] if not argument.startswith('--')]
+    # Only file arguments are handed over; a bare launch asks for a new window
+    if file_arguments and '--new-instance' not in sys.argv and send_to_running_instance(file_arguments):
+        if startup_profile:
+            startup_profile.mark('hand over')
+            startup_profile.report()
+        sys.exit(0)
     app = QApplication(sys.argv)
+    instance_server = InstanceServer()
+    serving = '--new-instance' not in sys.argv and instance_server.listen()
+    if '--instrument' in sys.argv:
+        instrumentation.setEnabled(True)
+    if startup_profile:
+        startup_profile.mark('QApplication')
     loadStyle()
-    file_to_open = None
-    if len(sys.argv) > 1:
-        file_to_open = sys.argv[1]
-    scratchpad = Scratchpad(file_to_open)
+    if startup_profile:
+        startup_profile.mark('stylesheet')
+    scratchpad = Scratchpad(file_arguments, startup_profile)
+    if serving:
+        instance_server.files_requested.connect(scratchpad.openRequestedFiles)
+        app.aboutToQuit.connect(instance_server.close)
+    if startup_profile:
+        startup_profile.mark('initUI')
     scratchpad.show()
+    if startup_profile:
+        startup_profile.mark('show')
+        if not file_arguments:
+            QTimer.singleShot(0, startup_profile.report)
+    QTimer.singleShot(0, scratchpad.offerRecovery)
     sys.exit(app.exec())
@@ -0,0 +1,47 @@
+import os
+import sys
+import tempfile
+
+os.environ['QT_QPA_PLATFORM'] = 'offscreen'
+_home = tempfile.mkdtemp(prefix='scratchpad-tests-')
+for variable in ('HOME', 'XDG_CONFIG_HOME', 'XDG_DATA_HOME', 'XDG_CACHE_HOME', 'XDG_RUNTIME_DIR'):
+    os.environ[variable] = os.path.join(_home, variable.lower())
+    os.makedirs(os.environ[variable], mode=0o700, exist_ok=True)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QEventLoop, QTimer
+
+
+@pytest.fixture(scope='session')
+def app():
+    return QApplication.instance() or QApplication(sys.argv[:1])
+
+
+def pump(milliseconds=20):
+    loop = QEventLoop()
+    QTimer.singleShot(milliseconds, loop.quit)
+    loop.exec()
+
+
+@pytest.fixture
+def window(app):
+    import scratchpad
+    window = scratchpad.Scratchpad()
+    window.show()
+    pump()
+    yield window
+    for tab in window.tabs():
+        tab.document.setModified(False)
+    window.close()
+    window.deleteLater()
+    pump()
+
+
+def wait_until(condition, timeout=10):
+    import time
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        pump(10)
@@ -0,0 +1,95 @@
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+
+import scratchpad
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_stream_replace_matches_re_sub_across_chunk_boundaries():
+    generator = random.Random(17)
+    pattern = re.compile('ab+a', re.MULTILINE)
+    for _ in range(200):
+        text = ''.join(generator.choice('ab\n') for _ in range(generator.randint(0, 300)))
+        size = generator.randint(1, 20)
+        pieces = [text[start:start + size] for start in range(0, len(text), size)]
+        output = list(scratchpad.stream_replace(iter(pieces), pattern, '<\\g<0>>', expand=True, overlap=8))
+        assert ''.join(piece for piece, _ in output) == pattern.sub('<\\g<0>>', text)
+        assert sum(count for _, count in output) == len(pattern.findall(text))
+
+
+def run_batch(tmp_path, *arguments):
+    summary_path = tmp_path / 'summary.json'
+    status = scratchpad.run_batch(['--batch', *arguments, '--jobs', '1', '--summary', str(summary_path)])
+    with open(summary_path, encoding='utf-8') as summary_file:
+        return status, json.load(summary_file)
+
+
+def test_dry_run_counts_without_writing(tmp_path):
+    (tmp_path / 'logs').mkdir()
+    (tmp_path / 'logs' / 'a.log').write_text('error\nok\nerror\n')
+    (tmp_path / 'logs' / 'b.txt').write_text('error\n')
+    status, summary = run_batch(tmp_path, str(tmp_path / 'logs'), '--find', 'error', '--replace', 'warning',
+                                '--include', '*.log', '--dry-run')
+    assert status == 0
+    files = [(os.path.basename(result['path']), result['matches'], result['status']) for result in summary['files']]
+    assert files == [('a.log', 2, 'would change')]
+    assert (tmp_path / 'logs' / 'a.log').read_text() == 'error\nok\nerror\n'
+
+
+def test_replace_across_chunks_and_reencode(tmp_path):
+    path = tmp_path / 'config.ini'
+    path.write_bytes(('naïve = 1\n' * 5000).encode('utf-8'))
+    status, summary = run_batch(tmp_path, str(path), '--find', r'(\w+) = 1', '--replace', r'\1 = 2', '--regex',
+                                '--encoding', 'latin-1', '--chunk-size', '1000', '--overlap', '64')
+    assert status == 0
+    assert summary['totals'] == {'files': 1, 'matches': 5000, 'changed': 1, 'failed': 0}
+    assert path.read_bytes() == ('naïve = 2\n' * 5000).encode('latin-1')
+
+
+def test_parallel_batch_from_the_command_line(tmp_path):
+    for number in range(6):
+        (tmp_path / f"{number}.txt").write_text('needle haystack\n' * 1000)
+    result = subprocess.run([sys.executable, os.path.join(ROOT, 'scratchpad.py'), '--batch', str(tmp_path),
+                             '--find', 'needle', '--replace', 'pin', '--jobs', '3'],
+                            capture_output=True, text=True, timeout=120,
+                            env=dict(os.environ, QT_QPA_PLATFORM='offscreen'))
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout)['totals'] == {'files': 6, 'matches': 6000, 'changed': 6, 'failed': 0}
+    assert all(path.read_text() == 'pin haystack\n' * 1000 for path in tmp_path.glob('*.txt'))
+
+
+def test_late_latin1_byte_falls_back_like_the_editor(tmp_path):
+    path = tmp_path / 'legacy.txt'
+    data = b'name = x\n' * 10000 + 'caf\xe9 = x\n'.encode('latin-1')
+    path.write_bytes(data)
+    status, summary = run_batch(tmp_path, str(path), '--find', '= x', '--replace', '= y', '--chunk-size', '4096')
+    assert status == 0
+    assert summary['files'][0]['status'] == 'changed'
+    assert summary['files'][0]['encoding'] != 'utf-8'
+    assert path.read_bytes() == data.replace(b'= x', b'= y')
+
+
+def test_non_ascii_replacement_before_a_late_latin1_byte(tmp_path):
+    path = tmp_path / 'legacy.txt'
+    path.write_bytes(b'cafe\n' * 10000 + 'caf\xe9\n'.encode('latin-1'))
+    status, summary = run_batch(tmp_path, str(path), '--find', 'cafe', '--replace', 'caf\xe9',
+                                '--chunk-size', '4096')
+    assert status == 0
+    assert summary['totals']['matches'] == 10000
+    assert path.read_bytes() == 'caf\xe9\n'.encode('latin-1') * 10001
+
+
+def test_file_without_matches_is_left_alone(tmp_path):
+    path = tmp_path / 'clean.txt'
+    path.write_text('nothing to see\n')
+    before = path.stat()
+    status, summary = run_batch(tmp_path, str(path), '--find', 'needle', '--replace', 'pin')
+    assert status == 0
+    assert summary['files'][0]['status'] == 'unchanged'
+    assert path.stat().st_ino == before.st_ino and path.stat().st_mtime_ns == before.st_mtime_ns
+    assert sorted(os.listdir(tmp_path)) == ['clean.txt', 'summary.json']
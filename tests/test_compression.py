@@ -0,0 +1,57 @@
+import bz2
+import gzip
+import lzma
+
+import pytest
+from PyQt6.QtWidgets import QMessageBox
+
+import scratchpad
+from conftest import wait_until
+
+FORMATS = [('gzip', '.gz', gzip), ('bz2', '.bz2', bz2), ('xz', '.xz', lzma)]
+
+
+@pytest.mark.parametrize('compression, suffix, module', FORMATS)
+def test_compressed_file_opens_and_saves_in_the_same_format(window, tmp_path, compression, suffix, module):
+    # A misleading suffix checks that the format comes from the magic bytes
+    path = tmp_path / 'rotated.log.1'
+    path.write_bytes(module.compress('première ligne\n'.encode('utf-8') * 20000))
+    window.openPath(str(path))
+    wait_until(lambda: not window.tab.isLoading())
+    assert window.tab.compression == compression
+    assert window.textEdit.toPlainText() == 'première ligne\n' * 20000
+    window.textEdit.insertPlainText('edited\n')
+    window.saveFile()
+    wait_until(lambda: not window.tab.document.isModified())
+    assert scratchpad.file_compression(str(path)) == compression
+    assert module.decompress(path.read_bytes()).decode('utf-8') == 'edited\n' + 'première ligne\n' * 20000
+
+
+def test_plain_text_starting_with_bz2_magic_opens_as_text(window, tmp_path, monkeypatch):
+    path = tmp_path / 'notes.txt'
+    path.write_text('BZh91AY&SY is how a bzip2 stream starts\n')
+    errors = []
+    monkeypatch.setattr(QMessageBox, 'critical', lambda parent, title, message: errors.append(message))
+    window.openPath(str(path))
+    wait_until(lambda: not window.tab.isLoading())
+    assert errors == []
+    assert window.tab.compression is None
+    assert window.textEdit.toPlainText() == path.read_text()
+
+
+def test_plain_text_starting_with_bz2_prefix_is_not_sniffed_as_bz2(tmp_path):
+    path = tmp_path / 'notes.txt'
+    path.write_text('BZh is not a compressed file\n')
+    assert scratchpad.file_compression(str(path)) is None
+    path.with_name('empty.bz2').write_bytes(bz2.compress(b''))
+    assert scratchpad.file_compression(str(path.with_name('empty.bz2'))) == 'bz2'
+
+
+def test_batch_rewrites_plain_text_that_looks_like_bz2_as_plain_text(tmp_path):
+    path = tmp_path / 'notes.txt'
+    path.write_text('BZh91AY&SY is how a bzip2 stream starts\n')
+    result = scratchpad.batch_process_file(str(path), dict(
+        find='bzip2', replace='bz2', regex=False, case_sensitive=True, whole_word=False, encoding=None,
+        dry_run=False, chunk_size=1024, overlap=64))
+    assert result['status'] == 'changed' and 'compression' not in result
+    assert path.read_text() == 'BZh91AY&SY is how a bz2 stream starts\n'
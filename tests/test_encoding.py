@@ -0,0 +1,48 @@
+from PyQt6.QtWidgets import QMessageBox
+
+import scratchpad
+from conftest import wait_until
+
+
+def load(window, path):
+    window.openPath(str(path))
+    wait_until(lambda: not window.tab.isLoading())
+    return window.tab
+
+
+def test_latin1_after_ascii_sample_round_trips(window, tmp_path, monkeypatch):
+    monkeypatch.setattr(scratchpad.FileLoadTask, 'chunk_size', 4096)
+    path = tmp_path / 'late.txt'
+    data = b'plain ascii line\n' * 8192 + 'caf\xe9 na\xefve\n'.encode('latin-1')
+    path.write_bytes(data)
+    tab = load(window, path)
+    assert window.textEdit.toPlainText().startswith('plain ascii line\n')
+    assert tab.encoding != 'utf-8'
+    assert not tab.lossy
+    assert scratchpad.encoding_cache.get(str(path), path.stat()) == tab.encoding
+    window.saveFile()
+    wait_until(lambda: not window.save_handler.isRunning())
+    wait_until(lambda: not tab.document.isModified())
+    assert path.read_bytes() == data
+
+
+def test_invalid_utf8_after_sample_asks_before_saving(window, tmp_path, monkeypatch):
+    path = tmp_path / 'mixed.txt'
+    path.write_bytes('na\xefve\n'.encode('utf-8') + b'x' * 70000 + b'\n\xff\n')
+    tab = load(window, path)
+    assert tab.lossy
+    assert window.textEdit.toPlainText().endswith("\n\ufffd\n")
+    asked = []
+    monkeypatch.setattr(QMessageBox, 'warning', lambda *args: asked.append(args) or QMessageBox.StandardButton.Cancel)
+    window.saveFile()
+    assert asked and window.save_handler is None
+
+
+def test_truncated_utf8_tail_is_not_taken_for_a_legacy_encoding(window, tmp_path):
+    path = tmp_path / 'cut.txt'
+    path.write_bytes(b'plain ascii line\n' * 100 + 'caf\xe9'.encode('utf-8')[:-1])
+    tab = load(window, path)
+    assert tab.encoding == 'utf-8'
+    assert tab.lossy
+    assert window.textEdit.toPlainText().endswith('caf�')
+    assert scratchpad.encoding_cache.get(str(path), path.stat()) == 'utf-8'
@@ -0,0 +1,33 @@
+from conftest import wait_until
+
+
+def follow(window, path):
+    window.openPath(str(path))
+    wait_until(lambda: not window.tab.isLoading())
+    window.startFollowing()
+    wait_until(lambda: window.tab.follower is not None and not window.tab.isLoading())
+    return window.tab
+
+
+def append(window, tab, path, data):
+    with open(path, 'ab') as file:
+        file.write(data)
+    window.readFollowedFile(tab)
+    return window.textEdit.toPlainText()
+
+
+def test_append_that_completes_a_crlf(window, tmp_path):
+    path = tmp_path / 'service.log'
+    path.write_bytes(b'one\r\ntwo\r')
+    tab = follow(window, path)
+    assert window.textEdit.toPlainText() == 'one\ntwo'
+    assert append(window, tab, path, b'\nthree\r\n') == 'one\ntwo\nthree\n'
+
+
+def test_append_that_completes_a_multibyte_character(window, tmp_path):
+    path = tmp_path / 'service.log'
+    path.write_bytes('one\ncaf\xe9'.encode('utf-8')[:-1])
+    tab = follow(window, path)
+    assert window.textEdit.toPlainText() == 'one\ncaf'
+    assert append(window, tab, path, '\xe9\n'.encode('utf-8')[-2:]) == 'one\ncaf\xe9\n'
+    assert not tab.lossy
@@ -0,0 +1,38 @@
+import time
+
+from PyQt6.QtCore import QTimer
+
+from conftest import wait_until
+
+
+def write_lines(path, count):
+    with open(path, 'w', encoding='utf-8') as file:
+        for number in range(count):
+            file.write(f"line {number} of a file that takes a while to load\n")
+
+
+def test_event_loop_keeps_running_during_a_large_load(window, tmp_path):
+    path = tmp_path / 'large.txt'
+    write_lines(path, 200_000)
+    ticks = []
+    heartbeat = QTimer()
+    heartbeat.setInterval(10)
+    heartbeat.timeout.connect(lambda: ticks.append(time.monotonic()))
+    heartbeat.start()
+    window.openPath(str(path))
+    wait_until(lambda: not window.tab.isLoading(), timeout=60)
+    heartbeat.stop()
+    gaps = [later - earlier for earlier, later in zip(ticks, ticks[1:])]
+    assert max(gaps) < 0.5
+    assert window.textEdit.toPlainText() == path.read_text(encoding='utf-8')
+
+
+def test_cancel_releases_a_loader_waiting_for_the_gui(window, tmp_path):
+    path = tmp_path / 'large.txt'
+    write_lines(path, 200_000)
+    window.openPath(str(path))
+    wait_until(lambda: window.tab.pending_text)
+    window.cancelStreamingLoad()
+    wait_until(lambda: window.loaderPool.activeThreadCount() == 0)
+    assert not window.tab.isLoading()
+    assert window.textEdit.toPlainText() == ''
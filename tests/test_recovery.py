@@ -0,0 +1,25 @@
+import os
+
+from PyQt6.QtGui import QTextCursor
+
+import scratchpad
+from conftest import wait_until
+
+
+def test_replay_counts_positions_in_utf16_units(window):
+    tab = window.tab
+    cursor = QTextCursor(tab.document)
+    cursor.insertText('\U0001F600 hello')
+    cursor.setPosition(0)
+    cursor.insertText('A')
+    cursor.movePosition(QTextCursor.MoveOperation.End)
+    cursor.insertText(' world')
+    cursor.setPosition(3)
+    cursor.setPosition(4, QTextCursor.MoveMode.KeepAnchor)
+    cursor.insertText('_')
+    window.flushJournal()
+    journal = tab.journal
+    wait_until(lambda: os.path.exists(journal.journal_path)
+               and sum(1 for _ in open(journal.journal_path, encoding='utf-8')) == journal.sequence)
+    meta = {'paths': [journal.meta_path, journal.journal_path, journal.snapshot_path, f"{journal.meta_path}.lock"]}
+    assert scratchpad.replay_journal(meta) == ('A\U0001F600_hello world', True)
@@ -0,0 +1,38 @@
+from conftest import pump
+
+
+def replace_all(window, text, find, replacement, regex=False):
+    window.textEdit.setPlainText(text)
+    window.openFindReplaceDialog()
+    dialog = window.findReplaceDialog
+    dialog.regex_checkbox.setChecked(regex)
+    dialog.find_input.setText(find)
+    dialog.replace_input.setText(replacement)
+    dialog.replace_all()
+    pump()
+    return dialog
+
+
+def test_replace_all_after_astral_characters(window):
+    replace_all(window, "\U0001F600 foo bar foo\nfoo", 'foo', 'X')
+    assert window.textEdit.toPlainText() == "\U0001F600 X bar X\nX"
+
+
+def test_regex_replace_all_after_astral_characters(window):
+    replace_all(window, "\U0001F600 foo bar \U0001F600foo\nfoo", '(f)(o+)', '\\2\\1', regex=True)
+    assert window.textEdit.toPlainText() == "\U0001F600 oof bar \U0001F600oof\noof"
+
+
+def test_replace_all_is_one_undo_step(window):
+    replace_all(window, "\U0001F600 foo bar foo\nfoo", 'foo', '')
+    assert window.textEdit.toPlainText() == "\U0001F600  bar \n"
+    window.textEdit.undo()
+    assert window.textEdit.toPlainText() == "\U0001F600 foo bar foo\nfoo"
+
+
+def test_replace_expands_backreferences_at_current_match(window):
+    dialog = replace_all(window, "\U0001F600\U0001F600 ab ab", '(a)(b)', '\\2\\1', regex=True)
+    window.textEdit.undo()
+    dialog.find_next()
+    dialog.replace()
+    assert window.textEdit.toPlainText() == "\U0001F600\U0001F600 ba ab"
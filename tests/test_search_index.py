@@ -0,0 +1,61 @@
+import random
+
+from PyQt6.QtGui import QTextCursor
+
+import scratchpad
+from conftest import pump
+
+
+def open_dialog(window, text, find, regex=False):
+    window.textEdit.setPlainText(text)
+    window.openFindReplaceDialog()
+    dialog = window.findReplaceDialog
+    dialog.regex_checkbox.setChecked(regex)
+    dialog.find_input.setText(find)
+    assert dialog.ensure_index()
+    return dialog
+
+
+def full_scan(window, dialog):
+    starts, ends = scratchpad.scan_matches(dialog.pattern, window.textEdit.toPlainText())
+    return list(starts), list(ends)
+
+
+def test_index_uses_document_positions_after_astral_characters(window):
+    dialog = open_dialog(window, "\U0001F600 foo bar foo\nfoo", 'foo')
+    assert list(dialog.starts) == [3, 11, 15]
+    dialog.find_next()
+    dialog.find_next()
+    assert window.textEdit.textCursor().selectedText() == 'foo'
+    assert window.textEdit.textCursor().selectionStart() == 11
+    assert dialog.match_label.text() == '2 of 3'
+
+
+def test_incremental_index_matches_full_scan(window):
+    generator = random.Random(5)
+    for find, regex in (('ab', False), ('a\\nb', True), ('b$', True), ('(?s:a.b)', True), ('(?is:A.B)', True)):
+        dialog = open_dialog(window, ''.join(generator.choice('ab\n\U0001F600') for _ in range(400)), find, regex)
+        for _ in range(150):
+            text = window.textEdit.toPlainText()
+            astral = scratchpad.astral_offsets(text)
+            start = generator.randint(0, len(text))
+            end = min(len(text), start + generator.randint(0, 3))
+            cursor = QTextCursor(window.textEdit.document())
+            cursor.setPosition(scratchpad.document_position(astral, start))
+            cursor.setPosition(scratchpad.document_position(astral, end), QTextCursor.MoveMode.KeepAnchor)
+            cursor.insertText(''.join(generator.choice('ab\n') for _ in range(generator.randint(0, 3))))
+            assert dialog.ensure_index()
+            assert (list(dialog.starts), list(dialog.ends)) == full_scan(window, dialog)
+        dialog.hide()
+    pump()
+
+
+def test_scoped_dotall_among_other_flags_rescans_the_whole_document(window):
+    dialog = open_dialog(window, 'a\nc', '(?is:a.b)', regex=True)
+    assert list(dialog.starts) == []
+    cursor = QTextCursor(window.textEdit.document())
+    cursor.setPosition(2)
+    cursor.setPosition(3, QTextCursor.MoveMode.KeepAnchor)
+    cursor.insertText('b')
+    assert dialog.ensure_index()
+    assert list(dialog.starts) == [0]
@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+import time
+
+from PyQt6.QtCore import QSettings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, 'scratchpad.py')
+
+
+def launch(*arguments, cwd):
+    return subprocess.Popen([sys.executable, SCRIPT, *arguments], cwd=cwd, stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL, text=True, env=dict(os.environ, QT_QPA_PLATFORM='offscreen'))
+
+
+def recent_files():
+    settings = QSettings("Scratchpad", "ScratchpadApp")
+    settings.sync()
+    return settings.value("recentFiles", [], type=list)
+
+
+def wait_for_recent(*paths, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not set(paths) <= set(recent_files()):
+        assert time.monotonic() < deadline, f"{paths} never opened; recent files: {recent_files()}"
+        time.sleep(0.1)
+
+
+def test_second_launch_hands_files_to_the_running_instance(app, tmp_path):
+    for name in ('a.txt', 'b.txt', 'c.txt', 'd.txt'):
+        (tmp_path / name).write_text(name)
+    primary = launch('a.txt', 'b.txt', cwd=tmp_path)
+    bare = None
+    try:
+        wait_for_recent(str(tmp_path / 'a.txt'), str(tmp_path / 'b.txt'))
+
+        started = time.monotonic()
+        second = launch('--startup-profile', 'c.txt', 'd.txt', cwd=tmp_path)
+        output, _ = second.communicate(timeout=30)
+        assert second.returncode == 0
+        assert time.monotonic() - started < 10
+        assert 'hand over' in output
+        wait_for_recent(str(tmp_path / 'c.txt'), str(tmp_path / 'd.txt'))
+
+        # Without file arguments a launch is a request for another window, not a hand-over
+        bare = launch(cwd=tmp_path)
+        time.sleep(3)
+        assert bare.poll() is None
+        assert primary.poll() is None
+    finally:
+        for process in (bare, primary):
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=10)
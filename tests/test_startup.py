@@ -0,0 +1,13 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_heavy_modules_are_imported_lazily():
+    script = ("import sys, scratchpad; "
+              "print(' '.join(name for name in ('requests', 'validators', 'chardet') if name in sys.modules))")
+    result = subprocess.run([sys.executable, '-c', script], cwd=ROOT, capture_output=True, text=True,
+                            env=dict(os.environ, QT_QPA_PLATFORM='offscreen'), timeout=60, check=True)
+    assert result.stdout.strip() == ''
@@ -0,0 +1,36 @@
+from PyQt6.QtWidgets import QDialog
+
+import scratchpad
+from conftest import pump, wait_until
+
+
+def test_cancelled_close_leaves_earlier_tabs_running(window, tmp_path, monkeypatch):
+    log = tmp_path / 'service.log'
+    log.write_text('started\n')
+    window.openPath(str(log))
+    wait_until(lambda: not window.tab.isLoading())
+    window.startFollowing()
+    wait_until(lambda: window.tab.follower is not None)
+    followed = window.tab
+    modified = window.newTab()
+    window.textEdit.insertPlainText('unsaved work')
+    monkeypatch.setattr(scratchpad.UnsavedWorkDialog, 'exec', lambda dialog: QDialog.DialogCode.Rejected)
+    assert not window.close()
+    assert followed.follower is not None
+    assert modified.document.toPlainText() == 'unsaved work'
+    pump()
+
+
+def test_confirmed_close_shuts_down_every_tab(window, tmp_path, monkeypatch):
+    log = tmp_path / 'service.log'
+    log.write_text('started\n')
+    window.openPath(str(log))
+    wait_until(lambda: not window.tab.isLoading())
+    window.startFollowing()
+    wait_until(lambda: window.tab.follower is not None)
+    followed = window.tab
+    window.newTab()
+    window.textEdit.insertPlainText('unsaved work')
+    monkeypatch.setattr(scratchpad.UnsavedWorkDialog, 'exec', lambda dialog: 2)
+    assert window.close()
+    assert followed.follower is None
@@ -0,0 +1,112 @@
+import os
+
+import pytest
+from PyQt6.QtCore import Qt
+from PyQt6 import sip
+from PyQt6.QtGui import QTextCursor, QTextDocument
+from PyQt6.QtTest import QTest
+
+import scratchpad
+from conftest import pump
+
+
+def resident_megabytes():
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+
+
+def replace_all(window, find, replacement):
+    dialog = window.findReplaceDialog
+    dialog.find_input.setText(find)
+    dialog.replace_input.setText(replacement)
+    dialog.replace_all()
+    pump()
+
+
+def test_replace_all_is_charged_for_matched_text_only(window):
+    window.textEdit.setPlainText('needle\n' + ('x' * 79 + '\n') * 13000 + '\nneedle')
+    window.tab.undo_history.budget = 1536 * 1024
+    window.openFindReplaceDialog()
+    replace_all(window, 'needle', 'pin')
+    assert window.tab.document.isUndoAvailable()
+    assert window.tab.undo_history.total < 4096
+    window.undo()
+    assert window.textEdit.toPlainText().count('needle') == 2
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/status'), reason="needs /proc to read the resident set size")
+def test_memory_stays_bounded_across_replace_all_cycles(window):
+    history = window.tab.undo_history
+    history.budget = 4 * 1024 * 1024
+    window.textEdit.setPlainText('alpha needle bravo charlie delta\n' * 10000)
+    window.openFindReplaceDialog()
+    samples = []
+    for cycle in range(35):
+        replace_all(window, 'needle', 'pin')
+        replace_all(window, 'pin', 'needle')
+        assert history.total <= history.budget
+        samples.append(resident_megabytes())
+    # The first cycles warm up Qt's layout and allocator; without a budget every later cycle keeps
+    # about 1.3 MiB more of undo history
+    assert samples[-1] - samples[14] < 15
+    assert window.tab.document.isUndoAvailable()
+    window.undo()
+    assert window.textEdit.toPlainText().count('pin') == 10000
+
+
+def test_typing_is_one_undo_step(window):
+    QTest.keyClicks(window.textEdit, 'hello')
+    QTest.keyClick(window.textEdit, Qt.Key.Key_Return)
+    QTest.keyClicks(window.textEdit, 'world')
+    pump()
+    assert window.textEdit.toPlainText() == 'hello\nworld'
+    QTest.keyClick(window.textEdit, Qt.Key.Key_Z, Qt.KeyboardModifier.ControlModifier)
+    assert window.textEdit.toPlainText() == ''
+
+
+def test_typing_elsewhere_starts_a_new_step(window):
+    QTest.keyClicks(window.textEdit, 'hello')
+    window.textEdit.moveCursor(QTextCursor.MoveOperation.Start)
+    QTest.keyClicks(window.textEdit, '> ')
+    pump()
+    window.undo()
+    assert window.textEdit.toPlainText() == 'hello'
+
+
+def test_undo_continues_through_spilled_checkpoints(window):
+    window.setSpillUndoHistory(True)
+    history = window.tab.undo_history
+    window.textEdit.setPlainText('base')
+    history.rebase()
+    history.budget = 3000
+    states = ['base']
+    cursor = QTextCursor(window.tab.document)
+    for number in range(6):
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.movePosition(QTextCursor.MoveOperation.StartOfBlock, QTextCursor.MoveMode.KeepAnchor)
+        cursor.insertText(f"{number}" * 600)
+        pump()
+        states.append(window.textEdit.toPlainText())
+    assert history.dropped and history.checkpoints
+    seen = [window.textEdit.toPlainText()]
+    while window.tab.document.isUndoAvailable() or history.checkpoints:
+        window.undo()
+        pump()
+        seen.append(window.textEdit.toPlainText())
+    assert seen[-1] == 'base'
+    assert seen == [state for state in reversed(states) if state in seen]
+    window.setSpillUndoHistory(False)
+
+
+def test_open_step_is_not_finished_after_its_document_is_deleted(app, monkeypatch):
+    finished = []
+    monkeypatch.setattr(scratchpad.UndoHistory, 'finishStep', lambda history: finished.append(history))
+    document = QTextDocument()
+    history = scratchpad.UndoHistory(document, 1024 * 1024)
+    QTextCursor(document).insertText('typed')
+    sip.delete(document)
+    pump()
+    assert finished == []
+    assert history.recording is not None
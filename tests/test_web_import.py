@@ -0,0 +1,83 @@
+import functools
+import http.server
+import threading
+import time
+
+import pytest
+from PyQt6.QtWidgets import QMessageBox
+
+from conftest import wait_until
+
+
+class RecordingHandler(http.server.SimpleHTTPRequestHandler):
+    def log_request(self, code='-', size='-'):
+        self.server.statuses.append(int(code))
+
+
+@pytest.fixture
+def server(tmp_path):
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(RecordingHandler, directory=tmp_path))
+    httpd.statuses = []
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def import_url(window, url):
+    window.startWebImport(url)
+    wait_until(lambda: not window.tab.isLoading())
+    return window.textEdit.toPlainText()
+
+
+def test_reimport_of_unchanged_url_is_a_conditional_get(window, server, tmp_path):
+    text = 'café au lait\n' * 20000
+    (tmp_path / 'page.txt').write_text(text, encoding='utf-8')
+    url = f"http://127.0.0.1:{server.server_port}/page.txt"
+    assert import_url(window, url) == text
+    assert import_url(window, url) == text
+    assert server.statuses == [200, 304]
+
+
+def test_import_over_the_byte_limit_is_refused(window, server, tmp_path, monkeypatch):
+    (tmp_path / 'big.txt').write_text('x' * 4096)
+    errors = []
+    monkeypatch.setattr(QMessageBox, 'critical', lambda parent, title, message: errors.append(message))
+    window.web_import_limit = 1024
+    import_url(window, f"http://127.0.0.1:{server.server_port}/big.txt")
+    assert errors and 'limit' in errors[0]
+    assert window.textEdit.toPlainText() == ''
+
+
+class StallingHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '1000000')
+        self.end_headers()
+        self.wfile.write(b'x' * 20000)
+        self.wfile.flush()
+        self.server.stalled.wait(10)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_cancel_does_not_wait_for_a_stalled_server(window):
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), StallingHandler)
+    httpd.stalled = threading.Event()
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    try:
+        window.startWebImport(f"http://127.0.0.1:{httpd.server_port}/")
+        fetcher = window.tab.web_fetcher
+        wait_until(lambda: window.tab.load_progress is not None and window.tab.load_progress[0] > 0)
+        started = time.monotonic()
+        window.cancelStreamingLoad()
+        assert time.monotonic() - started < 1
+        assert not window.tab.isLoading()
+        assert window.textEdit.toPlainText() == ''
+        wait_until(lambda: not window.detached_fetchers, timeout=5)
+        assert fetcher.isFinished()
+    finally:
+        httpd.stalled.set()
+        httpd.shutdown()
+        httpd.server_close()